@@ -0,0 +1,301 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from cache import surface_bytes
+
+
+# Folder of the script, or of the executable when frozen
+if getattr(sys, "frozen", False):
+    APP_DIR = os.path.dirname(sys.executable)
+else:
+    APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Data bundled into the PyInstaller exe wins, then files next to the app
+def resource_path(*parts):
+    for base in (getattr(sys, "_MEIPASS", None), APP_DIR):
+        if base:
+            path = os.path.join(base, *parts)
+            if os.path.exists(path):
+                return path
+    return os.path.join(APP_DIR, *parts)
+
+# Reads atlas metadata, returns None when missing or baked with other parameters
+def load_atlas(meta_path, params):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("params") != params:
+        print("Sprite atlas is stale, run bake_atlas.py. Loading images one by one.")
+        return None
+    meta["image"] = os.path.join(os.path.dirname(meta_path), meta["image"])
+    return meta
+
+
+# Blend paths, cheapest first
+BLEND_COPY = "copy"  # no alpha at all, a plain copy
+BLEND_COLORKEY = "colorkey"  # pixels fully on or off, RLE-encoded color key
+BLEND_PREMULTIPLIED = "premultiplied"  # per-pixel alpha, drawn with BLEND_PREMULTIPLIED
+BLEND_ALPHA = "alpha"  # per-pixel alpha
+
+# Key colors tried for colorkey images, one that the image itself uses is skipped
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 0), (1, 2, 3)]
+
+# Opaque, colorkey (every pixel fully on or off) or translucent
+def classify(surface):
+    w, h = surface.get_size()
+    if not surface.get_flags() & pygame.SRCALPHA and surface.get_colorkey() is None:
+        return "opaque"
+    # Masks honour both per-pixel alpha and a color key
+    solid = pygame.mask.from_surface(surface, 254).count()
+    if solid == w * h:
+        return "opaque"
+    return "colorkey" if pygame.mask.from_surface(surface, 0).count() == solid else "translucent"
+
+# Copy of a colorkey image without an alpha channel, None when every
+# candidate key color is used by the image
+def to_colorkey(surface):
+    clear = surface.get_width() * surface.get_height() - pygame.mask.from_surface(surface, 0).count()
+    for key in COLORKEY_CANDIDATES:
+        keyed = pygame.Surface(surface.get_size()).convert()
+        keyed.fill(key)
+        keyed.blit(surface, (0, 0))
+        if pygame.mask.from_threshold(keyed, key, (1, 1, 1, 255)).count() == clear:
+            keyed.set_colorkey(key, pygame.RLEACCEL)
+            return keyed
+    return None
+
+# Scaled down or up to fit into `box`, aspect kept
+def fit_into(surface, box):
+    iw, ih = surface.get_size()
+    scale = min(box[0] / iw, box[1] / ih)
+    return pygame.transform.scale(surface, (int(iw * scale), int(ih * scale)))
+
+# The cheapest display format for a surface of the given kind, and its blend path
+def prepare_surface(surface, kind, premultiply=False):
+    if kind == "opaque":
+        return surface.convert(), BLEND_COPY
+    if kind == "colorkey":
+        keyed = to_colorkey(surface)
+        if keyed is not None:
+            return keyed, BLEND_COLORKEY
+    surface = surface.convert_alpha()
+    if premultiply:
+        return surface.premul_alpha(), BLEND_PREMULTIPLIED
+    return surface, BLEND_ALPHA
+
+
+# Decodes images from a manifest of name -> (file, prepare). Decoding, the
+# optional prepare step (scaling) and sorting images into opaque, colorkey
+# and translucent run on a thread pool; the display-dependent conversion to
+# the matching format always happens on the main thread in get().
+# Sprites found in the atlas are sliced out of one decoded sheet instead.
+# Translucent images named in `premultiply` are stored premultiplied, their
+# blits need blend_flags(name).
+#
+# Only converted surfaces are kept, never the decoded originals: assets are
+# decoded at their final size by their prepare step, fit() scales one to the
+# window and decodes the file again for another size.
+#
+# Memory is held to `budget` bytes, counting the loader's surfaces and the
+# ones the app derives from them (attach()). Over budget, screens not on
+# display (see show()) are evicted whole, the one shown longest ago first:
+# their assets are dropped, to load again on their next get(), and the
+# app's holders for that screen are released. Holders shared by every
+# screen (screen None) are then asked to give back what they can.
+class AssetLoader:
+    ATLAS = "__atlas__"
+
+    def __init__(self, root, manifest, workers=4, atlas=None, premultiply=(), screens=None, budget=None):
+        self.root = root
+        self.manifest = manifest
+        self.atlas = atlas
+        self.atlas_rects = atlas["sprites"] if atlas else {}
+        self.premultiply = set(premultiply)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.futures = {}
+        self.surfaces = {}
+        self.kinds = {}  # name -> opaque, colorkey or translucent
+        self.blends = {}  # name -> blend path of the converted surface
+        self.timings = {}  # name -> ms spent decoding, preparing and converting
+        self.screens = screens or {}  # name -> screen showing it, assets of no screen always stay
+        self.budget = budget  # bytes of surfaces kept, None for no limit
+        self.holders = {}  # name -> (screen, memory(), release()) of surfaces kept by the app
+        self.active = set()  # screens on display
+        self.shown = {}  # screen -> show() count when last on display
+        self.shows = 0
+        self.boxes = {}  # name -> box a fitted asset was scaled into
+        self.evictions = 0
+
+    # Decodes and prepares an asset, nothing is kept. Safe on worker threads
+    def decode(self, name):
+        if name == self.ATLAS:
+            return pygame.image.load(self.atlas["image"])
+        filename, prepare = self.manifest[name]
+        surface = pygame.image.load(os.path.join(self.root, filename))
+        if prepare is not None:
+            surface = prepare(surface)
+        return surface
+
+    def _decode(self, name):
+        start = time.perf_counter()
+        surface = self.decode(name)
+        self.kinds[name] = classify(surface)
+        self.timings[name] = (time.perf_counter() - start) * 1000
+        return surface
+
+    def _job(self, name):
+        return self.ATLAS if name in self.atlas_rects else name
+
+    # Queue assets for background decoding
+    def start(self, names):
+        for name in names:
+            job = self._job(name)
+            if job not in self.surfaces and job not in self.futures:
+                self.futures[job] = self.pool.submit(self._decode, job)
+
+    def done(self, names=None):
+        jobs = self.futures if names is None else {self._job(name) for name in names}
+        return all(job in self.surfaces or (job in self.futures and self.futures[job].done()) for job in jobs)
+
+    def progress(self):
+        if not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures.values()) / len(self.futures)
+
+    def _convert(self, name, box=None):
+        future = self.futures.pop(name, None)
+        surface = future.result() if future is not None else self._decode(name)
+        start = time.perf_counter()
+        if box is not None:
+            surface = fit_into(surface, box)
+            self.boxes[name] = box
+        if name == self.ATLAS:
+            # Sprites are sorted out one by one when sliced
+            surface, self.blends[name] = surface.convert_alpha(), BLEND_ALPHA
+        else:
+            surface, self.blends[name] = prepare_surface(surface, self.kinds[name], name in self.premultiply)
+        self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+        return self._keep(name, surface)
+
+    def _keep(self, name, surface):
+        self.surfaces[name] = surface
+        self.trim()
+        return surface
+
+    # Returns the converted surface, waiting on a queued decode or loading
+    # synchronously on first use for assets that were never queued
+    def get(self, name):
+        surface = self.surfaces.get(name)
+        if surface is not None:
+            return surface
+        if name in self.atlas_rects:
+            sheet = self.surfaces.get(self.ATLAS) or self._convert(self.ATLAS)
+            surface = sheet.subsurface(pygame.Rect(self.atlas_rects[name]))
+            self.kinds[name] = classify(surface)
+            if self.kinds[name] == "translucent" and name not in self.premultiply:
+                # Copied out, a view would keep the whole sheet alive
+                surface, self.blends[name] = surface.copy(), BLEND_ALPHA
+            else:
+                surface, self.blends[name] = prepare_surface(surface, self.kinds[name], name in self.premultiply)
+            self._keep(name, surface)
+            # Every sprite is cut out, the sheet is not needed anymore
+            if all(sprite in self.surfaces for sprite in self.atlas_rects):
+                self.release(self.ATLAS)
+            return surface
+        return self._convert(name)
+
+    # The asset scaled to fit into `box`, aspect kept. Only that copy is
+    # kept, another box decodes the file again
+    def fit(self, name, box):
+        box = tuple(box)
+        if name in self.surfaces and self.boxes.get(name) == box:
+            return self.surfaces[name]
+        self.release(name)
+        return self._convert(name, box)
+
+    # The decoded image as is, neither converted nor kept: for callers
+    # that make their own scaled copies (see ScaledImageCache)
+    def take(self, name):
+        future = self.futures.pop(name, None)
+        return future.result() if future is not None else self._decode(name)
+
+    # Drops a kept asset, its next get() loads it again
+    def release(self, name):
+        self.surfaces.pop(name, None)
+        self.blends.pop(name, None)
+        self.boxes.pop(name, None)
+
+    # Counts surfaces the app keeps for `screen` (None: for every screen)
+    # against the budget. memory() returns their bytes, release() drops
+    # them when the screen is evicted, or for shared ones all they can spare
+    def attach(self, name, screen, memory, release):
+        self.holders[name] = (screen, memory, release)
+
+    # Screens on display now; the others can be evicted
+    def show(self, *screens):
+        self.shows += 1
+        self.active = set(screens)
+        for screen in screens:
+            self.shown[screen] = self.shows
+        self.trim()
+
+    # Evicts screens not on display until everything fits the budget
+    def trim(self):
+        if self.budget is None or self.total() <= self.budget:
+            return
+        inactive = {screen for screen in list(self.screens.values()) + [holder[0] for holder in self.holders.values()] if screen is not None and screen not in self.active}
+        for screen in sorted(inactive, key=lambda screen: self.shown.get(screen, 0)):
+            self.evict(screen)
+            if self.total() <= self.budget:
+                return
+        for screen, _, release in list(self.holders.values()):
+            if screen is None:
+                release()
+                if self.total() <= self.budget:
+                    return
+
+    def evict(self, screen):
+        for name in [name for name in self.surfaces if self.screens.get(name) == screen]:
+            self.release(name)
+            self.evictions += 1
+        for holder_screen, _, release in list(self.holders.values()):
+            if holder_screen == screen:
+                release()
+
+    # name -> bytes of pixel memory kept, the app's holders included
+    def memory(self):
+        memory = {name: surface_bytes(surface) for name, surface in self.surfaces.items()}
+        memory.update((name, holder[1]()) for name, holder in self.holders.items())
+        return memory
+
+    def total(self):
+        return sum(self.memory().values())
+
+    # special_flags for blitting an asset
+    def blend_flags(self, name):
+        return pygame.BLEND_PREMULTIPLIED if self.blends.get(name) == BLEND_PREMULTIPLIED else 0
+
+    def report(self):
+        lines = [f"{name:<20} {ms:8.2f} ms" for name, ms in sorted(self.timings.items(), key=lambda item: -item[1])]
+        lines.append(f"{'total':<20} {sum(self.timings.values()):8.2f} ms")
+        lines.append("")
+        lines.append(f"{'asset':<20} {'size':>9}  {'kind':<11} {'blend path':<13} {'screen':<7} {'KiB':>7}")
+        memory = self.memory()
+        for name, blend in sorted(self.blends.items()):
+            w, h = self.surfaces[name].get_size()
+            lines.append(f"{name:<20} {f'{w}x{h}':>9}  {self.kinds[name]:<11} {blend:<13} {self.screens.get(name, '-'):<7} {memory[name] / 1024:7.0f}")
+        for name, (screen, _, _) in sorted(self.holders.items()):
+            lines.append(f"{name:<20} {'':>9}  {'':<11} {'(app)':<13} {screen or '-':<7} {memory[name] / 1024:7.0f}")
+        budget = "no budget" if self.budget is None else f"budget {self.budget / 1024:.0f} KiB"
+        lines.append(f"{'kept':<20} {sum(memory.values()) / 1024:.0f} KiB, {budget}, {self.evictions} evicted")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
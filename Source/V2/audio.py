@@ -0,0 +1,122 @@
+# Audio kept off the startup path. The mixer is opened (and the background
+# music loaded) on a worker thread once the window is up; until then music
+# requests are only remembered and UI sounds are skipped. The UI sounds are
+# synthesized once into Sound objects in the mixer's own sample format, so
+# playing one is a buffer hand-off with no decoding.
+import array
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16  # signed 16-bit, what the synthesized sounds are made of
+MIXER_CHANNELS = 2
+
+# name -> (start Hz, end Hz, milliseconds, volume)
+UI_SOUNDS = {
+    "hover": (880, 880, 45, 0.18),
+    "click": (1320, 660, 35, 0.3),
+}
+
+
+# Sine sweep with a fast attack and an exponential decay, as 16-bit frames
+def synthesize(start_hz, end_hz, ms, volume, rate, channels):
+    count = rate * ms // 1000
+    samples = array.array("h")
+    phase = 0.0
+    for i in range(count):
+        t = i / count
+        phase += 2 * math.pi * (start_hz + (end_hz - start_hz) * t) / rate
+        envelope = min(1.0, i / (rate * 0.002)) * math.exp(-5 * t)
+        value = int(32767 * volume * envelope * math.sin(phase))
+        samples.extend([value] * channels)
+    return samples.tobytes()
+
+
+class Audio:
+    def __init__(self, music_path, buffer=512):
+        self.music_path = music_path
+        self.buffer = buffer
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        self.opening = None
+        self.ready = False
+        self.sounds = {}
+        self.sounds_enabled = True
+        self.music_loaded = False
+        self.music_wanted = False
+        self.music_playing = False
+        self.volume = 1.0
+        self.lock = threading.Lock()  # music state is set from both threads
+
+    # Opens the mixer in the background; calling it again is harmless
+    def start(self):
+        if self.opening is None:
+            self.opening = self.pool.submit(self._open, self.buffer)
+
+    # A new buffer size needs the mixer reopened, also in the background
+    def set_buffer(self, buffer):
+        if buffer != self.buffer:
+            self.buffer = buffer
+            if self.opening is not None:
+                self.opening = self.pool.submit(self._open, buffer)
+
+    def _open(self, buffer):
+        self.ready = False
+        with self.lock:
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            self.music_playing = False
+            try:
+                pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, buffer)
+            except pygame.error as e:
+                print(f"No audio: {e}")
+                return
+            rate, size, channels = pygame.mixer.get_init()
+            if size == MIXER_SIZE:
+                self.sounds = {name: pygame.mixer.Sound(buffer=synthesize(*params, rate, channels)) for name, params in UI_SOUNDS.items()}
+            try:
+                pygame.mixer.music.load(self.music_path)
+                self.music_loaded = True
+            except pygame.error:
+                print("Background music not found.")
+            self._update_music()
+            self.ready = True
+
+    # Fire and forget, skipped while the mixer is not up yet
+    def play(self, name):
+        if self.ready and self.sounds_enabled:
+            sound = self.sounds.get(name)
+            if sound is not None:
+                try:
+                    sound.play()
+                except pygame.error:
+                    pass  # mixer being reopened
+
+    def set_music(self, wanted, volume):
+        self.music_wanted = wanted
+        self.volume = volume
+        if self.ready:
+            self.update_music()
+
+    def update_music(self):
+        with self.lock:
+            if self.music_loaded:
+                self._update_music()
+
+    def _update_music(self):
+        try:
+            pygame.mixer.music.set_volume(self.volume)
+            if self.music_wanted and not self.music_playing:
+                pygame.mixer.music.play(-1)
+                self.music_playing = True
+            elif not self.music_wanted and self.music_playing:
+                pygame.mixer.music.stop()
+                self.music_playing = False
+        except pygame.error:
+            pass
+
+    # Waits for a mixer still being opened, pygame.quit() closes it after
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,303 @@
+# Bulk save backups into a content-addressed store:
+#
+#     <store>/objects/ab/abcdef...   one per distinct file content (sha256)
+#     <store>/snapshots/<time>.json  what every backed up save contained
+#
+# Files are read in chunks, never whole. Chunks of new files are compressed
+# on a process pool while the next ones are read, and a file whose content
+# is already in the store (from another save or an earlier run) is only
+# referenced. Files with the same size and mtime as in the last snapshot are
+# not even re-read.
+import hashlib
+import json
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+OBJECT_MAGIC = b"APB1"
+CHUNK_HEADER = struct.Struct("<I")
+PROGRESS_INTERVAL = 0.05
+
+
+# Runs in the worker processes
+def compress_chunk(chunk):
+    return zlib.compress(chunk, COMPRESS_LEVEL)
+
+def file_chunks(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def hash_file(path):
+    digest, size = hashlib.sha256(), 0
+    for chunk in file_chunks(path):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+def save_files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            yield path, os.path.relpath(path, root).replace(os.sep, "/")
+
+
+class BackupStore:
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.snapshots = os.path.join(root, "snapshots")
+
+    def object_path(self, sha):
+        return os.path.join(self.objects, sha[:2], sha)
+
+    def has(self, sha):
+        return os.path.exists(self.object_path(sha))
+
+    def snapshot_names(self):
+        try:
+            return sorted(name for name in os.listdir(self.snapshots) if name.endswith(".json"))
+        except OSError:
+            return []
+
+    def load_snapshot(self, name):
+        with open(os.path.join(self.snapshots, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_snapshot(self, snapshot):
+        os.makedirs(self.snapshots, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name, n = stamp + ".json", 1
+        while os.path.exists(os.path.join(self.snapshots, name)):
+            n += 1
+            name = f"{stamp}-{n}.json"
+        path = os.path.join(self.snapshots, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+        return name
+
+    # Decompressed content of an object, chunk by chunk
+    def read_object(self, sha):
+        with open(self.object_path(sha), "rb") as f:
+            if f.read(len(OBJECT_MAGIC)) != OBJECT_MAGIC:
+                raise ValueError(f"not a backup object: {sha}")
+            while True:
+                header = f.read(CHUNK_HEADER.size)
+                if not header:
+                    return
+                yield zlib.decompress(f.read(CHUNK_HEADER.unpack(header)[0]))
+
+    # Writes every save of a snapshot back under `dest`
+    def restore(self, snapshot, dest):
+        for save in snapshot["saves"]:
+            folder = os.path.join(dest, save["folder"])
+            for entry in save["files"]:
+                path = os.path.join(folder, *entry["path"].split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    for chunk in self.read_object(entry["sha256"]):
+                        f.write(chunk)
+
+
+# Temp file for one object, swapped in once its last chunk is written and
+# the content still matches the hash it was stored under. Snapshot entries
+# of the file (and of identical files found meanwhile) wait in `entries`
+# until then, so a snapshot never points at an object that was not written
+class ObjectWriter:
+    def __init__(self, store, sha):
+        self.path = store.object_path(sha)
+        self.tmp_path = self.path + ".tmp"
+        self.sha = sha
+        self.digest = hashlib.sha256()
+        self.entries = []  # (save's entry list, entry) added on commit
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(OBJECT_MAGIC)
+        self.stored = len(OBJECT_MAGIC)
+
+    def write(self, data):
+        self.file.write(CHUNK_HEADER.pack(len(data)))
+        self.file.write(data)
+        self.stored += CHUNK_HEADER.size + len(data)
+
+    # False when the file changed between hashing and reading it again
+    def commit(self):
+        self.file.close()
+        if self.digest.hexdigest() != self.sha:
+            os.remove(self.tmp_path)
+            return False
+        os.replace(self.tmp_path, self.path)
+        return True
+
+    # Gives up on the object, the temp file goes
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class BackupJob:
+    def __init__(self, store, saves, workers=None, on_progress=None):
+        self.store = store
+        self.saves = saves
+        self.workers = workers or os.cpu_count() or 2
+        self.on_progress = on_progress
+        self.thread = None
+        self.result = None
+        self.last_progress = 0.0
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if not self.running():
+            self.result = None
+            self.thread = threading.Thread(target=self._run, name="backup", daemon=True)
+            self.thread.start()
+
+    # Whatever goes wrong (a full disk, a broken process pool), the app
+    # hears that the job is over
+    def _run(self):
+        try:
+            self.result = self.run()
+        except Exception as e:
+            self.result = {"error": str(e) or type(e).__name__}
+        self._progress({**self.result, "done": True}, force=True)
+
+    def _progress(self, progress, force=False):
+        now = time.perf_counter()
+        if self.on_progress is not None and (force or now - self.last_progress >= PROGRESS_INTERVAL):
+            self.last_progress = now
+            self.on_progress(progress)
+
+    # path -> (size, mtime, sha256) from the newest snapshot
+    def previous_files(self):
+        names = self.store.snapshot_names()
+        if not names:
+            return {}
+        try:
+            snapshot = self.store.load_snapshot(names[-1])
+        except (OSError, ValueError):
+            return {}
+        return {
+            os.path.join(save["path"], *entry["path"].split("/")): (entry["size"], entry["mtime"], entry["sha256"])
+            for save in snapshot["saves"]
+            for entry in save["files"]
+        }
+
+    def run(self):
+        started = time.perf_counter()
+        previous = self.previous_files()
+        counts = {"saves": len(self.saves), "files": 0, "bytes": 0, "read": 0, "new": 0, "stored": 0, "deduplicated": 0, "unchanged": 0, "failed": 0}
+        writing = {}  # sha -> ObjectWriter of objects not committed yet
+        pending = deque()  # (writer, compressed chunk future, last chunk)
+        window = self.workers * 2
+
+        # Counts a file into the snapshot, only once its object exists
+        def add(entries, entry):
+            entries.append(entry)
+            counts["files"] += 1
+            counts["bytes"] += entry["size"]
+
+        # Drops an object and its queued chunks; the files waiting on it fail
+        def abort(writer):
+            for item in [item for item in pending if item[0] is writer]:
+                item[1].cancel()
+                pending.remove(item)
+            writer.abort()
+            writing.pop(writer.sha, None)
+            counts["failed"] += len(writer.entries)
+
+        # Writes finished chunks in order, keeping at most `limit` in flight
+        def drain(limit):
+            while len(pending) > limit:
+                writer, future, last = pending.popleft()
+                try:
+                    writer.write(future.result())
+                    if last and not writer.commit():
+                        # Changed after hashing, nothing was stored
+                        writing.pop(writer.sha, None)
+                        counts["failed"] += len(writer.entries)
+                        continue
+                except (OSError, zlib.error):
+                    abort(writer)
+                    continue
+                if last:
+                    del writing[writer.sha]
+                    counts["new"] += 1
+                    counts["stored"] += writer.stored
+                    for entries, entry in writer.entries:
+                        add(entries, entry)
+
+        snapshot_saves = []
+        # Spawned, not forked: the app has SDL and worker threads running, and
+        # a forked copy of a threaded process can deadlock
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                for save in self.saves:
+                    entries = []
+                    for path, rel_path in save_files(save.path):
+                        writer = None
+                        try:
+                            st = os.stat(path)
+                            cached = previous.get(path)
+                            if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns) and self.store.has(cached[2]):
+                                add(entries, {"path": rel_path, "size": st.st_size, "mtime": st.st_mtime_ns, "sha256": cached[2]})
+                                counts["unchanged"] += 1
+                            else:
+                                sha, size = hash_file(path)
+                                counts["read"] += size
+                                entry = {"path": rel_path, "size": size, "mtime": st.st_mtime_ns, "sha256": sha}
+                                if sha in writing:
+                                    # Same content as a file still being written, listed once that is done
+                                    writing[sha].entries.append((entries, entry))
+                                    counts["deduplicated"] += 1
+                                elif self.store.has(sha):
+                                    add(entries, entry)
+                                    counts["deduplicated"] += 1
+                                else:
+                                    writer = writing[sha] = ObjectWriter(self.store, sha)
+                                    writer.entries.append((entries, entry))
+                                    chunks = file_chunks(path)
+                                    chunk = next(chunks, None)
+                                    if chunk is None:
+                                        pending.append((writer, pool.submit(compress_chunk, b""), True))
+                                    while chunk is not None:
+                                        writer.digest.update(chunk)
+                                        next_chunk = next(chunks, None)
+                                        pending.append((writer, pool.submit(compress_chunk, chunk), next_chunk is None))
+                                        drain(window)
+                                        chunk = next_chunk
+                        except OSError:
+                            if writer is not None and writer.sha in writing:
+                                abort(writer)
+                            else:
+                                counts["failed"] += 1
+                            continue
+                        self._progress(dict(counts))
+                    snapshot_saves.append({"path": save.path, "folder": save.folder, "title": save.title, "title_id": save.title_id, "files": entries})
+                drain(0)
+            except BaseException:
+                # No temp files left behind when the job dies halfway
+                for writer in list(writing.values()):
+                    writer.abort()
+                raise
+
+        seconds = time.perf_counter() - started
+        counts["seconds"] = round(seconds, 2)
+        counts["mb_per_s"] = round(counts["bytes"] / (1024 * 1024) / seconds, 1) if seconds > 0 else 0.0
+        counts["snapshot"] = self.store.write_snapshot({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "saves": snapshot_saves, "stats": dict(counts)})
+        return counts
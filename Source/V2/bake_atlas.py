@@ -0,0 +1,55 @@
+# Bakes the pre-scaled menu sprites (logo, columns, jars) into one atlas image
+# plus a metadata file, so the app opens a single file at startup.
+# Run again after changing any of those images or their scaling in manifest.py:
+#     python bake_atlas.py
+import json
+import math
+import os
+
+import pygame
+
+from manifest import ATLAS_NAME, asset_manifest, atlas_params, atlas_sprites
+
+PADDING = 2
+
+
+# Simple shelf packing, tallest sprites first
+def pack(sizes):
+    total_area = sum((w + PADDING) * (h + PADDING) for w, h in sizes.values())
+    max_width = max(int(math.sqrt(total_area) * 1.2), max(w for w, _ in sizes.values()) + PADDING)
+    rects, x, y, shelf_height, width = {}, 0, 0, 0, 0
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], n)):
+        w, h = sizes[name]
+        if x + w > max_width:
+            x, y, shelf_height = 0, y + shelf_height + PADDING, 0
+        rects[name] = [x, y, w, h]
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+        width = max(width, x)
+    return rects, (width, y + shelf_height)
+
+def bake(images_path, out_dir):
+    sprites = {}
+    for name in atlas_sprites:
+        filename, prepare = asset_manifest[name]
+        img = pygame.image.load(os.path.join(images_path, filename))
+        sprites[name] = prepare(img) if prepare is not None else img
+    rects, size = pack({name: img.get_size() for name, img in sprites.items()})
+
+    sheet = pygame.Surface(size, pygame.SRCALPHA, 32)
+    sheet.fill((0, 0, 0, 0))
+    for name, img in sprites.items():
+        sheet.blit(img, rects[name][:2])
+
+    os.makedirs(out_dir, exist_ok=True)
+    image_name = f"{ATLAS_NAME}.png"
+    pygame.image.save(sheet, os.path.join(out_dir, image_name))
+    meta = {"image": image_name, "size": list(size), "params": atlas_params(), "sprites": rects}
+    with open(os.path.join(out_dir, f"{ATLAS_NAME}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1, sort_keys=True)
+    return meta
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    meta = bake(os.path.join(here, "static", "images"), os.path.join(here, "static", "atlas"))
+    print(f"Baked {len(meta['sprites'])} sprites into a {meta['size'][0]}x{meta['size'][1]} atlas")
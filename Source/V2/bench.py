@@ -0,0 +1,202 @@
+# Headless per-state frame-time benchmark. Drives ApolloApp.step() with
+# synthetic input through every state on a virtual 60 FPS clock, using SDL's
+# dummy video driver, and reports p50/p95/p99 frame times plus Python memory
+# allocated per frame.
+#
+#     python bench.py --out bench_results.json
+#     python bench.py --baseline bench_results.json --tolerance 0.25
+#     python bench.py --backend renderer --render-driver software
+#
+# With --baseline the run fails (exit code 1) when a state's p95 got slower
+# than the baseline by more than the tolerance.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main
+from main import ApolloApp, STATE_ABOUT, STATE_INTRO, STATE_MENU, STATE_RETURNING
+from render import BACKENDS
+
+FRAME_MS = 1000 / 60
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples):
+    times = sorted(ms for ms, _ in samples)
+    allocs = sorted(kib for _, kib in samples)
+    return {
+        "frames": len(times),
+        "p50_ms": round(percentile(times, 50), 3),
+        "p95_ms": round(percentile(times, 95), 3),
+        "p99_ms": round(percentile(times, 99), 3),
+        "max_ms": round(times[-1], 3) if times else 0.0,
+        "alloc_kib_mean": round(sum(allocs) / len(allocs), 2) if allocs else 0.0,
+        "alloc_kib_p95": round(percentile(allocs, 95), 2),
+    }
+
+
+# Steps the app on a virtual clock and files each frame under the state it
+# started in (or an explicit label)
+class Runner:
+    def __init__(self, app, trace_allocs):
+        self.app = app
+        self.trace_allocs = trace_allocs
+        self.now = pygame.time.get_ticks()
+        self.samples = {}
+
+    def frame(self, events=(), label=None):
+        app = self.app
+        label = label or app.state
+        events = pygame.event.get() + list(events)
+        if self.trace_allocs:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        app.step(events, int(self.now))
+        elapsed = (time.perf_counter() - start) * 1000
+        allocated = (tracemalloc.get_traced_memory()[1] - before) / 1024 if self.trace_allocs else 0.0
+        self.samples.setdefault(label, []).append((elapsed, allocated))
+        self.now += FRAME_MS
+
+    def until(self, done, events_for=lambda n: (), limit=20000):
+        n = 0
+        while not done() and n < limit:
+            self.frame(events_for(n))
+            n += 1
+            # The intro waits on loader threads, give them real time
+            if self.app.state == STATE_INTRO and self.app.intro_finished:
+                time.sleep(0.001)
+        return n
+
+
+def motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+def click(pos):
+    return [motion(pos), pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)]
+
+def key(k):
+    return [pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode="", scancode=0)]
+
+# Mouse sweeps from jar to jar, switching target every `every` frames
+def hover_sweep(app, every):
+    def events_for(n):
+        if n % every:
+            return ()
+        if (n // every) % 2:
+            return [motion((5, 5))]
+        rect = app.jar_rects[(n // (2 * every)) % len(app.jar_rects)]
+        return [motion(rect.center)]
+    return events_for
+
+
+def run_scenario(size, menu_frames, about_frames, trace_allocs, backend="surface", render_driver=None):
+    # Default settings, whatever the user picked on this machine
+    app = ApolloApp(size=size, settings_path=None, backend=backend, render_driver=render_driver)
+    runner = Runner(app, trace_allocs)
+    if trace_allocs:
+        tracemalloc.start()
+    try:
+        runner.until(lambda: app.state != STATE_INTRO)
+        runner.until(lambda: app.state == STATE_MENU, hover_sweep(app, 10))
+        runner.until(lambda: False, hover_sweep(app, 5), limit=menu_frames)
+
+        # Drag-resize burst on the settled menu
+        for i in range(30):
+            w, h = size[0] - 8 * i, size[1] - 4 * i
+            runner.frame([pygame.event.Event(pygame.VIDEORESIZE, w=w, h=h, size=(w, h))], label="resize")
+        runner.frame([pygame.event.Event(pygame.VIDEORESIZE, w=size[0], h=size[1], size=size)], label="resize")
+        runner.until(lambda: app.state == STATE_MENU and not app.apollo_backgrounds.pending, limit=600)
+
+        runner.frame(click(app.jar_rects[-1].center))
+        runner.until(lambda: False, limit=about_frames)
+        assert app.state == STATE_ABOUT, app.state
+
+        runner.frame(key(pygame.K_ESCAPE))
+        runner.until(lambda: app.state != STATE_RETURNING)
+        runner.until(lambda: app.state == STATE_MENU)
+
+        runner.frame(key(pygame.K_ESCAPE))
+        runner.until(lambda: not app.running)
+    finally:
+        if trace_allocs:
+            tracemalloc.stop()
+        app.close()
+    return runner.samples
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Headless per-state frame-time benchmark")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--size", default="1280x720", help="window size, WxH")
+    parser.add_argument("--menu-frames", type=int, default=600)
+    parser.add_argument("--about-frames", type=int, default=300)
+    parser.add_argument("--backend", choices=BACKENDS, default="surface", help="where frames are drawn, see render.py")
+    parser.add_argument("--render-driver", help="SDL renderer driver for --backend renderer, e.g. software")
+    parser.add_argument("--no-allocs", action="store_true", help="skip the allocation tracing pass")
+    parser.add_argument("--baseline", help="earlier results to compare p95 frame times against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    # Timings come from a clean pass, allocations from a second, traced pass
+    timed = run_scenario(size, args.menu_frames, args.about_frames, False, args.backend, args.render_driver)
+    traced = {} if args.no_allocs else run_scenario(size, args.menu_frames, args.about_frames, True, args.backend, args.render_driver)
+    states = {}
+    for label, samples in timed.items():
+        summary = summarize(samples)
+        if label in traced:
+            alloc = summarize(traced[label])
+            summary["alloc_kib_mean"], summary["alloc_kib_p95"] = alloc["alloc_kib_mean"], alloc["alloc_kib_p95"]
+        states[label] = summary
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "video_driver": os.environ["SDL_VIDEODRIVER"],
+            "platform": platform.platform(),
+            "size": list(size),
+            "dirty_rects": main.DIRTY_RECTS,
+            "backend": args.backend,
+            "render_driver": args.render_driver,
+        },
+        "states": states,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'state':<12} {'frames':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'alloc KiB':>10}")
+    for label, s in states.items():
+        print(f"{label:<12} {s['frames']:>6} {s['p50_ms']:>8.3f} {s['p95_ms']:>8.3f} {s['p99_ms']:>8.3f} {s['alloc_kib_mean']:>10.2f}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["states"]
+        regressions = [
+            f"{label}: p95 {s['p95_ms']:.3f} ms vs {baseline[label]['p95_ms']:.3f} ms"
+            for label, s in states.items()
+            if label in baseline and s["p95_ms"] > baseline[label]["p95_ms"] * (1 + args.tolerance)
+        ]
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
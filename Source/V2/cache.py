@@ -0,0 +1,262 @@
+import pygame
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Pixel memory held by a surface
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+# Copy in the display's pixel format, with or without alpha as the original
+def display_format(surface):
+    return surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+
+
+# Bounded least-recently-used cache with hit/miss counters. Bounded by item
+# count, and optionally by total size as measured by sizeof(value)
+class LRUCache:
+    def __init__(self, max_items=64, max_bytes=None, sizeof=surface_bytes):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.items = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.pop(key)
+        self.items[key] = value
+        if self.max_bytes is not None:
+            self.bytes += self.sizeof(value)
+        while len(self.items) > 1 and (
+            (self.max_items is not None and len(self.items) > self.max_items)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            self.pop(next(iter(self.items)))
+
+    def pop(self, key, default=None):
+        if key not in self.items:
+            return default
+        value = self.items.pop(key)
+        if self.max_bytes is not None:
+            self.bytes -= self.sizeof(value)
+        return value
+
+    def clear(self):
+        self.items.clear()
+        self.bytes = 0
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def stats(self):
+        stats = {"items": len(self.items), "max_items": self.max_items, "hits": self.hits, "misses": self.misses}
+        if self.max_bytes is not None:
+            stats.update(bytes=self.bytes, max_bytes=self.max_bytes)
+        return stats
+
+
+# Shared cache of rendered text surfaces keyed by (font, size, text, color,
+# alpha, premultiplied)
+class TextCache:
+    def __init__(self, max_items=128):
+        self.fonts = {}
+        self.surfaces = LRUCache(max_items)
+
+    def font(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            try:
+                font = pygame.font.Font(name, size)
+            except FileNotFoundError:
+                font = pygame.font.SysFont("Arial", size)
+            self.fonts[key] = font
+        return font
+
+    # Premultiplied text is drawn with BLEND_PREMULTIPLIED
+    def render(self, name, size, text, color, alpha=None, premultiplied=False):
+        key = (name, size, text, tuple(color), alpha, premultiplied)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font(name, size).render(text, True, color)
+            if alpha is not None:
+                # Baked into the per-pixel alpha: a surface alpha on top of
+                # it would take the slowest blit path on every draw
+                surface.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            if premultiplied:
+                # Font surfaces can have row padding premul_alpha() trips over
+                surface = surface.convert_alpha().premul_alpha()
+            self.surfaces.put(key, surface)
+        return surface
+
+    def stats(self):
+        return self.surfaces.stats()
+
+
+# Scaled copies of one image by size. The full-size image is not kept:
+# load() decodes it again on a worker thread for every new size (`image`, an
+# already decoded one, serves the first). A miss returns a cheap scale() of
+# the latest copy right away and queues the real one, smoothscale() when
+# smooth, scale() otherwise; poll() swaps it in once it is done. notify() is
+# called from the worker thread when a copy is ready. Copies are bounded by
+# count and by `max_bytes` of pixel memory, shrink() drops all but the latest.
+class ScaledImageCache:
+    def __init__(self, load, max_items=4, max_bytes=None, smooth=True, notify=None, image=None):
+        self.load = load
+        self.image = image
+        self.base = None  # latest full-quality copy, interim copies are scaled from it
+        self.interim = None  # copy handed out until the real one is done
+        self.smooth = smooth
+        self.notify = notify
+        self.sizes = LRUCache(max_items, max_bytes)
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scale")
+        self.pending = {}
+
+    def get(self, size):
+        size = tuple(size)
+        surface = self.sizes.get(size)
+        if surface is not None:
+            self.base = surface
+            self.interim = None
+            return surface
+        if self.base is not None:
+            interim = pygame.transform.scale(self.base, size)
+        else:
+            # Nothing scaled yet, the first copy comes from the full-size image
+            if self.image is None:
+                self.image = self.load()
+            interim = display_format(pygame.transform.scale(self.image, size))
+        # Only the latest size matters, drop queued jobs for sizes we moved past
+        for old_size in list(self.pending):
+            if old_size != size and self.pending[old_size].cancel():
+                del self.pending[old_size]
+        if size not in self.pending:
+            future = self.pool.submit(self._scale, self.image, size, self.smooth)
+            # Handed to the first job only, later ones load their own
+            self.image = None
+            if self.notify is not None:
+                future.add_done_callback(lambda _: self.notify())
+            self.pending[size] = future
+        self.interim = interim
+        return interim
+
+    def _scale(self, image, size, smooth):
+        if image is None:
+            image = self.load()
+        return pygame.transform.smoothscale(image, size) if smooth else pygame.transform.scale(image, size)
+
+    # Switching quality drops every copy scaled the other way
+    def set_smooth(self, smooth):
+        self.smooth = smooth
+        self.sizes.clear()
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+
+    # Returns the sizes whose full-quality copy just became available
+    def poll(self):
+        ready = [size for size, future in self.pending.items() if future.done()]
+        for size in ready:
+            future = self.pending.pop(size)
+            if not future.cancelled():
+                # convert() needs the display, so it happens here on the main thread
+                self.base = display_format(future.result())
+                self.sizes.put(size, self.base)
+        return ready
+
+    # Bytes of pixel memory kept, the interim copy and the full-size image
+    # not yet handed over included
+    def memory(self):
+        kept = list(self.sizes.items.values())
+        for surface in (self.base, self.interim, self.image):
+            if surface is not None and not any(surface is other for other in kept):
+                kept.append(surface)
+        return sum(surface_bytes(surface) for surface in kept)
+
+    def shrink(self):
+        for size, surface in list(self.sizes.items.items()):
+            if surface is not self.base:
+                self.sizes.pop(size)
+        self.image = None
+
+    def stats(self):
+        return {**self.sizes.stats(), "bytes": self.memory()}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Thumbnails of image files that fit in `size`. Files are decoded and scaled
+# on worker threads, the results live in an LRU bounded by pixel memory.
+# get() returns None until a thumbnail is ready, poll() hands over finished
+# ones and notify() is called from the worker when one is done.
+class ThumbnailCache:
+    def __init__(self, size, max_bytes=16 * 1024 * 1024, workers=2, notify=None):
+        self.size = size
+        self.notify = notify
+        self.thumbs = LRUCache(max_items=None, max_bytes=max_bytes)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        self.pending = {}
+        self.failed = set()
+
+    def _load(self, path):
+        image = pygame.image.load(path)
+        iw, ih = image.get_size()
+        scale = min(self.size[0] / iw, self.size[1] / ih)
+        size = (max(1, int(iw * scale)), max(1, int(ih * scale)))
+        try:
+            return pygame.transform.smoothscale(image, size)
+        except ValueError:
+            # smoothscale only takes 24 and 32 bit images
+            return pygame.transform.scale(image, size)
+
+    def get(self, path):
+        thumb = self.thumbs.get(path)
+        if thumb is None and path not in self.pending and path not in self.failed:
+            future = self.pool.submit(self._load, path)
+            if self.notify is not None:
+                future.add_done_callback(lambda _: self.notify())
+            self.pending[path] = future
+        return thumb
+
+    # Drops queued loads for paths that are no longer wanted (rows scrolled away)
+    def retain(self, paths):
+        for path in [path for path in self.pending if path not in paths]:
+            if self.pending[path].cancel():
+                del self.pending[path]
+
+    # Returns the paths whose thumbnail just became available
+    def poll(self):
+        ready = []
+        for path in [path for path, future in self.pending.items() if future.done()]:
+            future = self.pending.pop(path)
+            if future.cancelled():
+                continue
+            try:
+                # convert_alpha() needs the display, so it happens here on the main thread
+                self.thumbs.put(path, future.result().convert_alpha())
+                ready.append(path)
+            except (pygame.error, OSError, ValueError):
+                self.failed.add(path)
+        return ready
+
+    def stats(self):
+        return {**self.thumbs.stats(), "pending": len(self.pending), "failed": len(self.failed)}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
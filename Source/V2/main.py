@@ -1,386 +1,1432 @@
 import pygame
 import sys
 import os
+import time
+import multiprocessing
 
-pygame.init()
+from audio import Audio
+from assets import APP_DIR, AssetLoader, load_atlas, resource_path
+from backup import BackupJob, BackupStore
+from cache import LRUCache, ScaledImageCache, TextCache, ThumbnailCache, surface_bytes
+from manifest import ATLAS_NAME, asset_manifest, asset_screens, atlas_params, jar_names, menu_assets, premultiplied_assets
+from patchdb import SEARCH_LIMIT, PatchDB, read_body
+from navigation import Navigator
+from perf import INPUT_EVENTS, FrameStats, LatencyLog
+from render import create_backend, fade_to_color
+from savescan import SaveScanner, format_size, usb_roots
+from settings import KNOBS, Settings, format_value
+from sync import SyncClient
+from trophies import TrophyLibrary
+from tweens import Timeline, Tween, ease_out
+from widgets import ListView
 
 # Screen setup
 WIDTH, HEIGHT = 1280, 720
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Apollo Save Tool")
 
 # Paths
-images_path = "static/images"
-font_path = "static/font/Adonais.ttf"
+images_path = resource_path("static", "images")
+atlas_path = resource_path("static", "atlas", f"{ATLAS_NAME}.json")
+font_path = resource_path("static", "font", "Adonais.ttf")
 bg_music_path = os.path.join(images_path, "bg.mp3")
 
-# Column configuration
-TARGET_HEIGHT = 150
+# Save roots: "USB Saves" looks on mounted drives, "HDD Saves" in the app's
+# saves folder. Both hold PS3/SAVEDATA/<save> or savedata/<user>/<save>
+hdd_saves_root = os.path.join(APP_DIR, "saves")
+save_index_path = os.path.join(APP_DIR, "index", "saves.json")
+# The backup scanner prunes and rewrites its index on its own, so it gets one
+backup_index_path = os.path.join(APP_DIR, "index", "backup_saves.json")
+
+# Local mirror of the save-patch database (.savepatch files) for "Online DB"
+patch_db_root = os.path.join(APP_DIR, "patches")
+patch_index_path = os.path.join(APP_DIR, "index", "patches.db")
+# The mirror is refreshed with F5 on the Online DB screen, from the HTTP
+# source given with --sync-url or as "sync_url" in the settings file
+sync_state_path = os.path.join(APP_DIR, "index", "sync.json")
+
+# Content-addressed backup store used by the "Tools" jar
+backup_root = os.path.join(APP_DIR, "backups")
+# Trophy sets copied from dev_hdd0/home/<user>/trophy, summaries cached
+trophy_root = os.path.join(APP_DIR, "trophies")
+trophy_cache_path = os.path.join(APP_DIR, "index", "trophies.json")
+settings_path = os.path.join(APP_DIR, "settings.json")
+
+# Column configuration (sprite sizes and scales live in manifest.py)
 COLUMN_GAP = 20
 COLUMN1_EXTRA_GAP = 50
 COLUMN6_EXTRA_GAP = 80
 
-# Per-column offsets and scales
+# Per-column offsets
 column_offsets = [40, 11, 26, 0, 50, 0, 70]
-column_scales = [1.0, 1.0, 1.0, 1.1, 1.0, 1.0, 1.0]
 
 # Jar positioning adjustments
 jar_offsets = [1, 1, 1, 1, 1, 1, 1]
-jar_scale = 0.8 
 
-# Jar labels
-jar_labels = ["Trophies", "USB Saves", "HDD Saves", "Online DB", "Tools", "Settings", "About"]
-label_font_size = 36
-try:
-    label_font = pygame.font.Font(font_path, label_font_size)
-except FileNotFoundError:
-    label_font = pygame.font.SysFont("Arial", label_font_size)
-
-# Load and scale background images
-apollo_img = pygame.image.load(os.path.join(images_path, "apollo.jpg")).convert_alpha()
-intro_img = pygame.image.load(os.path.join(images_path, "buk_scr.png")).convert_alpha()
-
-def resize_backgrounds(w, h):
-    return pygame.transform.scale(apollo_img, (w, h)), intro_img
-
-apollo_scaled, _ = resize_backgrounds(WIDTH, HEIGHT)
-
-# Intro image scaling
-intro_max_width, intro_max_height = 600, 400
-iw, ih = intro_img.get_size()
-scale_factor = min(intro_max_width / iw, intro_max_height / ih)
-intro_scaled = pygame.transform.scale(intro_img, (int(iw * scale_factor), int(ih * scale_factor)))
-intro_rect = intro_scaled.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-
-# Logo and text images
-logo_img = pygame.image.load(os.path.join(images_path, "logo.png")).convert_alpha()
-logo_img = pygame.transform.scale(logo_img, (280, 280))
-logo_text_img = pygame.image.load(os.path.join(images_path, "logo_text.png")).convert_alpha()
-orig_w, orig_h = logo_text_img.get_size()
-scale_w = 500
-scale_h = int(orig_h * (scale_w / orig_w))
-logo_text_img = pygame.transform.scale(logo_text_img, (scale_w, scale_h))
+# Rendering mode: when the menu is settled, only redraw the jars whose hover changed
+DIRTY_RECTS = True
 
-# Credits
-credits_text = "Created by MexrlDev"
-try:
-    credits_font = pygame.font.Font(font_path, 18)
-except FileNotFoundError:
-    credits_font = pygame.font.SysFont("Arial", 18)
-credits_surface = credits_font.render(credits_text, True, (255, 255, 255))
-
-# Load column images
-column_files = [f"column_{i}.png" for i in range(1, 8)]
-columns = [pygame.image.load(os.path.join(images_path, filename)).convert_alpha() for filename in column_files]
-
-# Scale columns
-scaled_columns = []
-for i, col in enumerate(columns):
-    w, h = col.get_size()
-    scale_w = int(w * (TARGET_HEIGHT / h) * column_scales[i])
-    scaled_columns.append(pygame.transform.scale(col, (scale_w, TARGET_HEIGHT)))
-
-# Load jars and hover images
-jar_names = ["jar_trophy", "jar_usb", "jar_hdd", "jar_db", "jar_bup", "jar_opt", "jar_about"]
-jars, jars_hover = [], []
-for name in jar_names:
-    base_img = pygame.image.load(os.path.join(images_path, f"{name}.png")).convert_alpha()
-    hover_img = pygame.image.load(os.path.join(images_path, f"{name}_hover.png")).convert_alpha()
-    bw, bh = base_img.get_size()
-    hw, hh = hover_img.get_size()
-    jars.append(pygame.transform.scale(base_img, (int(bw * jar_scale), int(bh * jar_scale))))
-    jars_hover.append(pygame.transform.scale(hover_img, (int(hw * jar_scale), int(hh * jar_scale))))
-
-# Functions to update positions based on window size
-def update_positions(w, h):
-    logo_rect = logo_img.get_rect(center=(w // 2, h // 2 - 177))
-    logo_text_rect = logo_text_img.get_rect(midtop=(logo_rect.centerx, logo_rect.bottom + 2))
-    credits_rect = credits_surface.get_rect(bottomleft=(10, h - 10))
-    return logo_rect, logo_text_rect, credits_rect
-
-logo_rect, logo_text_rect, credits_rect = update_positions(WIDTH, HEIGHT)
-
-def get_column_positions(w, h, gap=COLUMN_GAP, extra_gap=COLUMN1_EXTRA_GAP, gap6=COLUMN6_EXTRA_GAP):
-    total_width = sum(col.get_width() for col in scaled_columns) + gap * (len(scaled_columns) - 1) + (extra_gap - gap) + (gap6 - gap)
-    start_x = (w - total_width) // 2
-    positions, x = [], start_x
-    for i, col in enumerate(scaled_columns):
-        rect = col.get_rect(midbottom=(x + col.get_width() // 2, h))
-        rect.y += column_offsets[i]
-        positions.append(rect)
-        if i == 0:
-            x += col.get_width() + extra_gap
-        elif i == 5:
-            x += col.get_width() + gap6
-        else:
-            x += col.get_width() + gap
-    return positions
+# Asset formats: translucent jars and columns can be stored premultiplied and
+# drawn with BLEND_PREMULTIPLIED (surface backend only, textures blend
+# straight alpha); see --asset-timings for every asset's blend path and memory.
+# Off: on pygame 2.6 those blits are slower than straight alpha (jar_trophy
+# 26 -> 36 us, column_6 83 -> 105 us). Faded labels are the exception, their
+# premultiplied blit is cheaper (7.4 -> 5.1 us), so they keep it
+PREMULTIPLIED_SPRITES = False
+PREMULTIPLIED_LABELS = True
 
-column_rects = get_column_positions(WIDTH, HEIGHT)
+# Frame pacing: the FPS cap (a setting) applies while animating, and when
+# nothing animates the loop sleeps until input arrives (or the timeout passes)
+# instead of drawing frames
+IDLE_WAIT = True
+IDLE_TIMEOUT_MS = 1000
+IDLE_POLL_MS = 25
 
-def get_jar_positions():
-    return [
-        jars[i].get_rect(midbottom=(column_rects[i].centerx, column_rects[i].top + jar_offsets[i]))
-        for i in range(len(jars))
-    ]
+# Toggles the performance overlay
+HUD_KEY = pygame.K_F3
 
-jar_rects = get_jar_positions()
+SYNC_KEY = pygame.K_F5
 
-# Setup music
-try:
-    pygame.mixer.music.load(bg_music_path)
-except pygame.error:
-    print("Background music not found.")
+# Posted from worker threads to wake an idle loop
+WAKE_EVENT = pygame.event.custom_type()
+# Carries progress of background tasks (patch sync, backups)
+TASK_EVENT = pygame.event.custom_type()
 
-clock = pygame.time.Clock()
+# Jar labels
+jar_labels = ["Trophies", "USB Saves", "HDD Saves", "Online DB", "Tools", "Settings", "About"]
+label_font_size = 36
+
+# Jar hover animation: the glow fades in while the jar grows a little,
+# pre-rendered in this many steps
+HOVER_STEPS = 8
+HOVER_SCALE = 1.06
+HOVER_IN_MS = 120
+HOVER_OUT_MS = 180
+
+# Save and patch lists
+panel_margin = 60
+save_font_size = 24
+save_subtitle_font_size = 20
+save_row_height = 60
+patch_row_height = 34
+setting_row_height = 48
+patch_preview_lines = 18
+save_icon_size = (96, 53)
+trophy_grade_colors = {"P": (170, 200, 255), "G": (230, 190, 60), "S": (190, 190, 200), "B": (190, 120, 60)}
+# Memory for decoded ICON0 thumbnails, least recently drawn ones go first
+thumbnail_budget = 16 * 1024 * 1024
+# Memory for the loaded assets and the window-size copies made from them,
+# screens not on display give theirs back first
+asset_budget = 32 * 1024 * 1024
+
+# Credits
+credits_text = "Created by MexrlDev"
 
 # States
 STATE_INTRO = "intro"
 STATE_SHOW_APOLLO = "show_apollo"
 STATE_FADE_OUT = "fade_out"
+STATE_MENU = "menu"
 STATE_ABOUT = "about"
 STATE_RETURNING = "returning"
+STATE_SAVES = "saves"
+STATE_PATCHES = "patches"
+STATE_TOOLS = "tools"
+STATE_TROPHIES = "trophies"
+STATE_SETTINGS = "settings"
 STATE_SHUTDOWN = "shutdown"
-state = STATE_INTRO
-
-# Timing variables
-intro_start = None
-apollo_start = None
-white_overlay_start = None
-shutdown_start = None
-music_started = False
-
-# Overlay surface for fade effects
-overlay = pygame.Surface((WIDTH, HEIGHT)).convert()
-overlay.fill((255, 255, 255))
-
-# Fade functions
-def fade_in(surface, duration, start_time):
-    elapsed = pygame.time.get_ticks() - start_time
-    alpha = max(0, 255 - int(255 * (elapsed / duration)))
-    surface.set_alpha(alpha)
-    return alpha
-
-def fade_out(surface, duration, start_time):
-    elapsed = pygame.time.get_ticks() - start_time
-    alpha = min(255, int(255 * (elapsed / duration)))
-    surface.set_alpha(alpha)
-    return alpha
-
-# Load About assets
-help_img = pygame.image.load(os.path.join(images_path, "help.png")).convert_alpha()
-cat_about_img = pygame.image.load(os.path.join(images_path, "cat_about.png")).convert_alpha()
-top_line_img = pygame.image.load(os.path.join(images_path, "top_line.png")).convert_alpha()
-memorial_img = pygame.image.load(os.path.join(images_path, "leon_luna.jpg")).convert_alpha()
-
-# Force cat_about to be square
-size = min(cat_about_img.get_width(), cat_about_img.get_height())
-cat_about_img = pygame.transform.scale(cat_about_img, (size, size))
-
-def scale_help_big(w, h):
-    max_w, max_h = int(w * 0.85), int(h * 0.85)
-    iw, ih = help_img.get_size()
-    scale_factor = min(max_w / iw, max_h / ih)
-    return pygame.transform.scale(help_img, (int(iw * scale_factor), int(ih * scale_factor)))
-
-# Main loop
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    mouse_pos = pygame.mouse.get_pos()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                if state == STATE_ABOUT:
-                    state = STATE_RETURNING
-                    white_overlay_start = current_time
-                elif state in [STATE_SHOW_APOLLO, STATE_FADE_OUT]:
-                    # Trigger shutdown animation
-                    state = STATE_SHUTDOWN
-                    shutdown_start = current_time
-                    pygame.mixer.music.stop()
-        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            for i, rect in enumerate(jar_rects):
-                if rect.collidepoint(mouse_pos):
-                    if jar_labels[i] == "About":
-                        state = STATE_ABOUT
-        elif event.type == pygame.VIDEORESIZE:
-            WIDTH, HEIGHT = event.w, event.h
-            screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-            # Rescale backgrounds
-            apollo_scaled, _ = resize_backgrounds(WIDTH, HEIGHT)
-            overlay = pygame.Surface((WIDTH, HEIGHT)).convert()
-            overlay.fill((255, 255, 255))
-            # Update positions
-            logo_rect, logo_text_rect, credits_rect = update_positions(WIDTH, HEIGHT)
-            column_rects = get_column_positions(WIDTH, HEIGHT)
-            jar_rects = get_jar_positions()
-            intro_rect = intro_scaled.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-
-    # Clear screen
-    screen.fill((0, 0, 0))
-
-    # Handle states
-    if state == STATE_INTRO:
-        if intro_start is None:
-            intro_start = current_time
-        elapsed = current_time - intro_start
-        if elapsed < 1000:
-            fade_in(intro_scaled, 1000, intro_start)
-            screen.blit(intro_scaled, intro_rect)
-        elif elapsed < 3100:
-            screen.blit(intro_scaled, intro_rect)
-        elif elapsed < 4100:
-            fade_out(intro_scaled, 1000, intro_start + 2100)
-            screen.blit(intro_scaled, intro_rect)
-        else:
-            state = STATE_SHOW_APOLLO
-            apollo_start = current_time
-
-    elif state == STATE_SHOW_APOLLO:
-        # Draw Apollo background
-        screen.blit(apollo_scaled, (0, 0))
-        # Play music once
-        if not music_started:
-            try:
-                pygame.mixer.music.play(-1)
-                music_started = True
-            except:
-                pass
-        # Draw logo and text
-        screen.blit(logo_img, logo_rect)
-        screen.blit(logo_text_img, logo_text_rect)
-        # Draw credits
-        credits_rect = credits_surface.get_rect(bottomleft=(10, HEIGHT - 10))
-        screen.blit(credits_surface, credits_rect)
-        # Draw columns
-        for col, rect in zip(scaled_columns, column_rects):
-            screen.blit(col, rect)
-        # Draw jars + hover effect + labels
-        jar_rects = get_jar_positions()
-        for i, rect in enumerate(jar_rects):
-            screen.blit(jars[i], rect)
-            if rect.collidepoint(mouse_pos):
-                screen.blit(jars_hover[i], rect)
-            label_surface = label_font.render(jar_labels[i], True, (0, 0, 0))
-            label_surface.set_alpha(22)
-            if rect.collidepoint(mouse_pos):
-                label_surface.set_alpha(255)
-            label_rect = label_surface.get_rect(midbottom=(rect.centerx, rect.top - 5))
-            screen.blit(label_surface, label_rect)
-        # Transition to fade out
-        state = STATE_FADE_OUT
-
-    elif state == STATE_FADE_OUT:
-        # Draw Apollo UI
-        screen.blit(apollo_scaled, (0, 0))
-        screen.blit(logo_img, logo_rect)
-        screen.blit(logo_text_img, logo_text_rect)
-        credits_rect = credits_surface.get_rect(bottomleft=(10, HEIGHT - 10))
-        screen.blit(credits_surface, credits_rect)
-        for col, rect in zip(scaled_columns, column_rects):
-            screen.blit(col, rect)
-        jar_rects = get_jar_positions()
-        for i, rect in enumerate(jar_rects):
-            screen.blit(jars[i], rect)
-            if rect.collidepoint(mouse_pos):
-                screen.blit(jars_hover[i], rect)
-            label_surface = label_font.render(jar_labels[i], True, (0, 0, 0))
-            label_surface.set_alpha(80)
-            if rect.collidepoint(mouse_pos):
-                label_surface.set_alpha(255)
-            label_rect = label_surface.get_rect(midbottom=(rect.centerx, rect.top - 5))
-            screen.blit(label_surface, label_rect)
-        # Overlay fade out
-        if white_overlay_start is None:
-            white_overlay_start = current_time
-        elapsed = current_time - white_overlay_start
-        alpha = max(0, 255 - int(255 * (elapsed / 5000)))
-        overlay.set_alpha(alpha)
-        screen.blit(overlay, (0, 0))
-        # Transition to about or next state could be added here if needed
-
-    elif state == STATE_ABOUT:
-        # Draw background
-        screen.blit(apollo_scaled, (0, 0))
-        # Draw help panel scaled big
-        help_scaled = scale_help_big(WIDTH, HEIGHT)
-        help_rect = help_scaled.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        screen.blit(help_scaled, help_rect)
-        # Draw "about" info
-        cat_size = min(cat_about_img.get_width(), cat_about_img.get_height())
-        cat_about_img_scaled = pygame.transform.scale(cat_about_img, (cat_size, cat_size))
-        cat_rect = cat_about_img_scaled.get_rect(topleft=(20, 20))
-        screen.blit(cat_about_img_scaled, cat_rect)
+# Asset screen each state draws, the loader may evict the others
+STATE_SCREENS = {
+    STATE_INTRO: "intro",
+    STATE_SHOW_APOLLO: "menu",
+    STATE_FADE_OUT: "menu",
+    STATE_MENU: "menu",
+    STATE_RETURNING: "menu",
+    STATE_SHUTDOWN: "menu",
+    STATE_ABOUT: "about",
+    STATE_SAVES: "lists",
+    STATE_PATCHES: "lists",
+    STATE_TOOLS: "lists",
+    STATE_TROPHIES: "lists",
+    STATE_SETTINGS: "lists",
+}
+
+def post_wake():
+    # Workers can finish after the window is gone
+    try:
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+    except pygame.error:
+        pass
+
+def post_progress(task, progress):
+    try:
+        pygame.event.post(pygame.event.Event(TASK_EVENT, task=task, progress=progress))
+    except pygame.error:
+        pass
+
+def all_save_roots():
+    return [hdd_saves_root] + usb_roots()
+
+# pygame.event.wait() polls the queue every millisecond, sleeping in slices
+# between checks keeps an idle window far cheaper
+def wait_for_events(timeout_ms):
+    deadline = pygame.time.get_ticks() + timeout_ms
+    while True:
+        events = pygame.event.get()
+        if events or pygame.time.get_ticks() >= deadline:
+            return events
+        pygame.time.wait(IDLE_POLL_MS)
+
+
+# Scaled copy of a sprite; color-keyed ones are not filtered, that would
+# bleed the key color into their edges
+def scale_sprite(image, size):
+    key = image.get_colorkey()
+    if key is None:
+        return pygame.transform.smoothscale(image, size)
+    scaled = pygame.transform.scale(image, size)
+    scaled.set_colorkey(key, pygame.RLEACCEL)
+    return scaled
+
+
+# Hover animation of one jar, rendered once: per step the jar scaled up a
+# little (standing on the same bottom edge) and its glow at that step's
+# alpha. A premultiplied jar gets the glow composited in, one blit per
+# step; a straight-alpha one keeps the glow as a second layer, as many
+# blits as a static jar
+class HoverFrames:
+    def __init__(self, jar, glow, premultiplied, glow_premultiplied):
+        w, h = jar.get_size()
+        if premultiplied and not glow_premultiplied:
+            # A glow stored straight (colorkey, opaque) is premultiplied once here
+            glow = glow.convert_alpha().premul_alpha()
+            glow_premultiplied = True
+        # Fading a premultiplied glow scales every channel, a straight one its alpha
+        fade = (lambda alpha: (alpha, alpha, alpha, alpha)) if glow_premultiplied else (lambda alpha: (255, 255, 255, alpha))
+        self.frames = []  # (jar, glow or None)
+        for step in range(HOVER_STEPS):
+            t = step / (HOVER_STEPS - 1)
+            if step == 0:
+                self.frames.append((jar, None))
+                continue
+            size = (round(w * (1 + (HOVER_SCALE - 1) * t)), round(h * (1 + (HOVER_SCALE - 1) * t)))
+            alpha = round(255 * t)
+            if premultiplied:
+                # Over in premultiplied space is exact
+                scaled_glow = scale_sprite(glow, size)
+                scaled_glow.fill(fade(alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                frame = scale_sprite(jar, size)
+                frame.blit(scaled_glow, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+                self.frames.append((frame, None))
+                continue
+            scaled_glow = scale_sprite(glow, size)
+            if scaled_glow.get_flags() & pygame.SRCALPHA:
+                scaled_glow.fill(fade(alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            else:
+                scaled_glow.set_alpha(alpha, pygame.RLEACCEL)
+            self.frames.append((scale_sprite(jar, size), scaled_glow))
 
+    # Rect of a step's jar, standing where the static jar stands
+    def rect(self, step, jar_rect):
+        return self.frames[step][0].get_rect(midbottom=jar_rect.midbottom)
+
+    # Bytes of the frames rendered here, step 0 is the loader's sprite
+    def memory(self):
+        return sum(surface_bytes(surface) for frame in self.frames[1:] for surface in frame if surface is not None)
+
+
+# About screen compiled once per window size, so a frame is only a few blits
+class AboutLayout:
+    def __init__(self, app, w, h):
+        loader, text_cache = app.loader, app.text_cache
+        # Help panel scaled big
+        help_scaled = loader.fit("help", (int(w * 0.85), int(h * 0.85)))
+        help_rect = help_scaled.get_rect(center=(w // 2, h // 2))
+        # "about" info
+        cat_about_img = loader.get("cat_about")
+        top_line_img = loader.get("top_line")
+        cat_rect = cat_about_img.get_rect(topleft=(20, 20))
         top_line_rect = top_line_img.get_rect(midleft=(cat_rect.right + 10, cat_rect.centery))
-        screen.blit(top_line_img, top_line_rect)
 
         # Text info
-        try:
-            small_font = pygame.font.Font(font_path, 24)
-        except FileNotFoundError:
-            small_font = pygame.font.SysFont("Arial", 24)
-
-        text1 = small_font.render("This is Apollo Save Tool PS3/PS4 copy but on pc, made with python", True, (255, 255, 255))
+        text1 = text_cache.render(font_path, 24, "This is Apollo Save Tool PS3/PS4 copy but on pc, made with python", (255, 255, 255))
         text1_rect = text1.get_rect(midtop=(help_rect.centerx, help_rect.top + 40))
-        screen.blit(text1, text1_rect)
-
-        text1b = small_font.render("(Made By MexrlDev)", True, (255, 255, 255))
+        text1b = text_cache.render(font_path, 24, "(Made By MexrlDev)", (255, 255, 255))
         text1b_rect = text1b.get_rect(midtop=(help_rect.centerx, text1_rect.bottom + 10))
-        screen.blit(text1b, text1b_rect)
-
-        text2 = label_font.render("In memory of leon and luna", True, (255, 255, 255))
+        text2 = text_cache.render(font_path, label_font_size, "In memory of leon and luna", (255, 255, 255))
         text2_rect = text2.get_rect(midtop=(help_rect.centerx, text1b_rect.bottom + 40))
-        screen.blit(text2, text2_rect)
 
         # Memorial image
-        mem_w, mem_h = 300, 200
-        memorial_scaled = pygame.transform.scale(memorial_img, (mem_w, mem_h))
+        memorial_scaled = loader.get("memorial")
         memorial_rect = memorial_scaled.get_rect(midtop=(help_rect.centerx, text2_rect.bottom + 20))
-        screen.blit(memorial_scaled, memorial_rect)
 
         # Bottom link text
-        bottom_text = small_font.render("https://github.com/bucanero/apollo-ps3", True, (255, 255, 255))
+        bottom_text = text_cache.render(font_path, 24, "https://github.com/bucanero/apollo-ps3", (255, 255, 255))
         bottom_text_rect = bottom_text.get_rect(midbottom=(help_rect.centerx, help_rect.bottom - 20))
-        screen.blit(bottom_text, bottom_text_rect)
-
-    elif state == STATE_RETURNING:
-        # Fade back to Apollo
-        screen.blit(apollo_scaled, (0, 0))
-        elapsed = current_time - white_overlay_start
-        alpha = min(255, int(255 * (elapsed / 1500)))
-        overlay.set_alpha(alpha)
-        screen.blit(overlay, (0, 0))
-        if elapsed >= 1500:
-            state = STATE_SHOW_APOLLO
-            white_overlay_start = None
-
-    elif state == STATE_SHUTDOWN:
-        # White background with closing bars
-        screen.fill((255, 255, 255))
-        logo_rect = logo_img.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        screen.blit(logo_img, logo_rect)
-
-        elapsed = current_time - shutdown_start
-        progress = min(1.0, elapsed / 4000.0)  # 4 seconds
-
-        bar_height = int((HEIGHT // 2) * progress)
-        # Top bar
-        top_rect = pygame.Rect(0, 0, WIDTH, bar_height)
-        pygame.draw.rect(screen, (0, 0, 0), top_rect)
-        # Bottom bar
-        bottom_rect = pygame.Rect(0, HEIGHT - bar_height, WIDTH, bar_height)
-        pygame.draw.rect(screen, (0, 0, 0), bottom_rect)
-
-        if progress >= 1.0:
-            running = False
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+
+        self.size = (w, h)
+        self.blits = [
+            (help_scaled, help_rect),
+            (cat_about_img, cat_rect),
+            (top_line_img, top_line_rect),
+            (text1, text1_rect),
+            (text1b, text1b_rect),
+            (text2, text2_rect),
+            (memorial_scaled, memorial_rect),
+            (bottom_text, bottom_text_rect),
+        ]
+
+    def draw(self, surface):
+        surface.blits(self.blits, doreturn=False)
+
+
+# The whole app. run() is the real main loop, step() runs exactly one frame
+# so the app can also be driven from scripts (see bench.py)
+class ApolloApp:
+    def __init__(self, size=(WIDTH, HEIGHT), asset_timings=False, trace_path=None, settings_path=settings_path, backend="surface", render_driver=None, latency_path=None, asset_budget=asset_budget, sync_url=None):
+        # Only what the first frame needs. pygame.init() would also open the
+        # audio device here, the mixer comes up later on its own thread
+        pygame.display.init()
+        pygame.font.init()
+        pygame.time.wait(0)  # starts SDL's timer, get_ticks() reads 0 without it
+        self.width, self.height = size
+        # Profile and overrides from the Settings jar, applied live
+        self.settings = Settings(settings_path)
+        # Window surface or SDL renderer (see render.py); list screens and
+        # the about screen draw into self.screen either way
+        self.backend = create_backend(backend, size, "Apollo Save Tool", render_driver, self.settings.get("smooth_scaling"))
+        self.screen = self.backend.surface
+        self.clock = pygame.time.Clock()
+        self.asset_timings = asset_timings
+        # Frame timings and counters for the HUD and the --trace file
+        self.stats = FrameStats(trace_path)
+        self.latency = LatencyLog(latency_path) if latency_path else None
+        # Arrow keys and game controllers, with repeat for held directions
+        self.navigator = Navigator()
+        self.settings_list = ListView((0, 0, 0, 0), setting_row_height, self.draw_setting_row)
+        self.settings_list.set_count(1 + len(KNOBS))  # the profile, then every knob
+        self.setting_selected = 0
+
+        # Shared cache of rendered text, so steady frames never rasterize
+        # glyphs; room for every jar label at every hover step
+        self.text_cache = TextCache(max_items=128)
+        self.label_font = self.text_cache.font(font_path, label_font_size)
+        self.credits_surface = self.text_cache.render(font_path, 18, credits_text, (255, 255, 255))
+        self.stats.watch("text", self.text_cache.stats)
+
+        # Only the intro splash is decoded before the first frame, the menu assets
+        # load on the thread pool while the intro fade plays
+        premultiply = PREMULTIPLIED_SPRITES and self.backend.name == "surface"
+        premultiply_labels = PREMULTIPLIED_LABELS and self.backend.name == "surface"
+        self.loader = AssetLoader(images_path, asset_manifest, atlas=load_atlas(atlas_path, atlas_params()), premultiply=premultiplied_assets if premultiply else (), screens=asset_screens, budget=asset_budget)
+        self.loader.show("intro")
+        self.asset_screen = "intro"
+        # Jar labels fade with the hover animation, premultiplied they take
+        # the cheaper blit at every alpha
+        self.label_flags = pygame.BLEND_PREMULTIPLIED if premultiply_labels else 0
+        self.intro_scaled = self.loader.get("intro")
+        self.loader.start(menu_assets)
+        self.assets_ready = False
+        self.menu_loaded = False  # menu sprites and the layers built from them are held
+        self.intro_rect = self.intro_scaled.get_rect(center=(self.width // 2, self.height // 2))
+
+        # Background scaled per window size, the few most recent sizes stay cached
+        self.apollo_backgrounds = None
+        self.menu_layer = None
+        self.hover_frames = None
+
+        # Layouts by window size, dropped when leaving the about screen
+        self.about_layouts = LRUCache(max_items=2)
+
+        # Save lists stream in from the scanner's worker threads
+        self.scanner = SaveScanner(save_index_path, notify=post_wake)
+        self.saves = []
+        self.saves_label = None
+        self.save_list = ListView((0, 0, 0, 0), save_row_height, self.draw_save_row)
+        self.thumbnails = ThumbnailCache(save_icon_size, max_bytes=thumbnail_budget, notify=post_wake)
+        self.visible_icons = set()
+
+        # Patch database index, built and searched on its own worker thread
+        self.patchdb = PatchDB(patch_db_root, patch_index_path, notify=post_wake)
+        self.patches = []
+        self.patch_query = ""
+        self.patch_selected = None
+        self.patch_body = []
+        self.patch_list = ListView((0, 0, 0, 0), patch_row_height, self.draw_patch_row)
+        self.sync_url = sync_url or self.settings.sync_url
+        self.sync_client = None  # no URL, no sync
+        if self.sync_url:
+            try:
+                self.sync_client = SyncClient(self.sync_url, patch_db_root, sync_state_path, on_progress=lambda progress: post_progress("sync", progress))
+            except ValueError as e:
+                print(f"Patch sync disabled: {e}")
+        self.sync_status = None
+
+        # Backups find saves with their own scanner, so the save list screen
+        # can keep using the other one meanwhile
+        self.backup_store = BackupStore(backup_root)
+        self.snapshot_count = None  # snapshots in the store, read when the Tools screen opens
+        self.backup_scanner = SaveScanner(backup_index_path, notify=post_wake)
+        self.backup_saves = None  # saves found so far while a backup is being prepared
+        self.backup_job = None
+        self.backup_status = None
+
+        # Trophy set summaries come from a cache, a set's trophies are only
+        # parsed when it is opened
+        self.trophies = TrophyLibrary(trophy_cache_path, notify=post_wake)
+        self.trophy_sets = []
+        self.trophy_set_list = ListView((0, 0, 0, 0), save_row_height, self.draw_trophy_set_row)
+        self.trophy_open = None  # index of the set being shown
+        self.trophy_details = None  # its trophies, None until parsed
+        self.trophy_list = ListView((0, 0, 0, 0), save_row_height, self.draw_trophy_row)
+
+        # Shared by the list screens
+        self.list_drawn = None  # background work status on screen, None forces a redraw
+        self.panel_backdrop = None
+        self.list_text = TextCache(max_items=256)
+        self.stats.watch("list_text", self.list_text.stats)
+
+        # Mixer, music and UI sounds, opened once the intro is on screen
+        self.audio = Audio(bg_music_path, buffer=self.settings.get("audio_buffer"))
+
+        self.state = STATE_INTRO
+        self.running = True
+        self.mouse_pos = pygame.mouse.get_pos()
+
+        # Transitions (fades, shutdown bars) run as tweens on one timeline
+        self.timeline = Timeline()
+        self.intro_finished = False
+        self.music_wanted = False  # music plays from the menu on, if enabled
+        self.focus_jar = None  # jar under the pointer or picked with keys / controller
+        self.pointer_focus = True  # the focus follows the pointer until keys move it
+        self.hover_targets = [0.0] * len(jar_labels)  # where each jar's hover tween is heading
+        self.menu_hover_drawn = None  # hover steps currently on screen, None forces a full redraw
+        self.pending_size = None
+        self.idle = False
+        self.apply_settings()
+
+        # Intro: fade in, hold, fade out
+        self.timeline.add("intro", Tween(1000, 0, 255, on_complete=self.hold_intro), pygame.time.get_ticks())
+
+    # Pick up the menu assets once the loader has finished them
+    def finish_loading(self):
+        loader = self.loader
+        # Only copies at window sizes are kept, a new size decodes the file again
+        self.apollo_backgrounds = ScaledImageCache(lambda: loader.decode("apollo"), max_items=4, max_bytes=loader.budget, smooth=self.settings.get("smooth_scaling"), notify=post_wake, image=loader.take("apollo"))
+        self.apollo_scaled = self.apollo_backgrounds.get((self.width, self.height))
+        # Window-size copies count against the asset budget too, and go with
+        # the screen drawing them
+        loader.attach("apollo backgrounds", None, self.apollo_backgrounds.memory, self.apollo_backgrounds.shrink)
+        loader.attach("menu layer", "menu", lambda: surface_bytes(self.menu_layer) if self.menu_layer is not None else 0, self.unload_menu)
+        loader.attach("hover frames", "menu", lambda: sum(frames.memory() for frames in self.hover_frames) if self.hover_frames is not None else 0, self.unload_menu)
+        loader.attach("panel backdrop", "lists", lambda: surface_bytes(self.panel_backdrop) if self.panel_backdrop is not None else 0, self.drop_panel_backdrop)
+        self.load_menu()
+        self.assets_ready = True
+        self.set_focus(self.jar_at(self.mouse_pos), self.timeline.now)
+
+    # Menu sprites from the loader, laid out for the window size; loaded
+    # again when the menu comes back after unload_menu()
+    def load_menu(self):
+        loader = self.loader
+        self.logo_img = loader.get("logo")
+        self.logo_text_img = loader.get("logo_text")
+        self.scaled_columns = [loader.get(f"column_{i + 1}") for i in range(7)]
+        self.jars = [loader.get(name) for name in jar_names]
+        self.jars_hover = [loader.get(f"{name}_hover") for name in jar_names]
+        # Blit flags matching how each sprite is stored
+        self.column_flags = [loader.blend_flags(f"column_{i + 1}") for i in range(7)]
+        self.jar_flags = [loader.blend_flags(name) for name in jar_names]
+        self.jar_hover_flags = [loader.blend_flags(f"{name}_hover") for name in jar_names]
+        # Jar sprites keep their size whatever the window size, so their
+        # hover frames are rendered once
+        self.hover_frames = [
+            HoverFrames(jar, hover, flags == pygame.BLEND_PREMULTIPLIED, hover_flags == pygame.BLEND_PREMULTIPLIED)
+            for jar, hover, flags, hover_flags in zip(self.jars, self.jars_hover, self.jar_flags, self.jar_hover_flags)
+        ]
+        self.menu_loaded = True
+        self.layout_menu()
+
+    # Drops every reference to the menu sprites so the loader's eviction
+    # frees them; the rects stay for the pointer
+    def unload_menu(self):
+        if not self.menu_loaded:
+            return
+        sprites = [self.logo_img, self.logo_text_img] + self.scaled_columns + self.jars + self.jars_hover
+        sprites += [surface for frames in self.hover_frames for frame in frames.frames for surface in frame if surface is not None]
+        for sprite in sprites:
+            self.backend.forget(sprite)
+        self.logo_img = self.logo_text_img = None
+        self.scaled_columns = self.jars = self.jars_hover = None
+        self.hover_frames = None
+        self.menu_layer = None
+        self.menu_hover_drawn = None
+        self.menu_loaded = False
+
+    def drop_panel_backdrop(self):
+        self.panel_backdrop = None
+
+    # Lets the loader evict what the screens not on display hold, and
+    # brings the menu back when it is shown again
+    def show_screen(self, screen):
+        if screen == self.asset_screen:
+            return
+        self.asset_screen = screen
+        self.loader.show(screen)
+        if screen == "menu" and self.assets_ready and not self.menu_loaded:
+            self.load_menu()
+
+    # Background at the window size, and the menu laid out on it when loaded
+    def refresh_menu(self):
+        self.apollo_scaled = self.apollo_backgrounds.get((self.width, self.height))
+        if self.menu_loaded:
+            self.layout_menu()
+
+    # Lay out the menu for the current window size
+    def layout_menu(self):
+        w, h = self.width, self.height
+        self.logo_rect = self.logo_img.get_rect(center=(w // 2, h // 2 - 177))
+        self.logo_text_rect = self.logo_text_img.get_rect(midtop=(self.logo_rect.centerx, self.logo_rect.bottom + 2))
+        self.credits_rect = self.credits_surface.get_rect(bottomleft=(10, h - 10))
+        self.column_rects = self.get_column_positions(w, h)
+        self.jar_rects = [
+            self.jars[i].get_rect(midbottom=(self.column_rects[i].centerx, self.column_rects[i].top + jar_offsets[i]))
+            for i in range(len(self.jars))
+        ]
+        self.label_rects = []
+        for i, rect in enumerate(self.jar_rects):
+            label_rect = pygame.Rect((0, 0), self.label_font.size(jar_labels[i]))
+            label_rect.midbottom = (rect.centerx, rect.top - 5)
+            self.label_rects.append(label_rect)
+        # Jar and label rects per hover step (labels rise with the jar), and
+        # everything a jar covers at any step
+        self.step_rects = []
+        self.jar_areas = []
+        for i, (jar_rect, label_rect) in enumerate(zip(self.jar_rects, self.label_rects)):
+            rects = [self.hover_frames[i].rect(step, jar_rect) for step in range(HOVER_STEPS)]
+            self.step_rects.append([(rect, label_rect.move(0, rect.top - jar_rect.top)) for rect in rects])
+            self.jar_areas.append(rects[-1].unionall([label_rect, self.step_rects[i][-1][1]]))
+        self.menu_layer = self.build_menu_layer() if self.backend.retained else None
+
+    def get_column_positions(self, w, h, gap=COLUMN_GAP, extra_gap=COLUMN1_EXTRA_GAP, gap6=COLUMN6_EXTRA_GAP):
+        scaled_columns = self.scaled_columns
+        total_width = sum(col.get_width() for col in scaled_columns) + gap * (len(scaled_columns) - 1) + (extra_gap - gap) + (gap6 - gap)
+        start_x = (w - total_width) // 2
+        positions, x = [], start_x
+        for i, col in enumerate(scaled_columns):
+            rect = col.get_rect(midbottom=(x + col.get_width() // 2, h))
+            rect.y += column_offsets[i]
+            positions.append(rect)
+            if i == 0:
+                x += col.get_width() + extra_gap
+            elif i == 5:
+                x += col.get_width() + gap6
+            else:
+                x += col.get_width() + gap
+        return positions
+
+    # Static menu layer (background, logo, credits, columns) flattened into one surface
+    def build_menu_layer(self):
+        layer = pygame.Surface((self.width, self.height)).convert()
+        layer.blit(self.apollo_scaled, (0, 0))
+        layer.blit(self.logo_img, self.logo_rect)
+        layer.blit(self.logo_text_img, self.logo_text_rect)
+        layer.blit(self.credits_surface, self.credits_rect)
+        for col, rect, flags in zip(self.scaled_columns, self.column_rects, self.column_flags):
+            layer.blit(col, rect, special_flags=flags)
+        return layer
+
+    # Static part of the menu: the flattened layer, or with the renderer the
+    # pieces themselves, the background scaled by the renderer
+    def draw_menu_base(self, target):
+        if self.menu_layer is not None:
+            target.blit(self.menu_layer, (0, 0))
+            return
+        target.stretch(self.apollo_scaled, pygame.Rect(0, 0, self.width, self.height))
+        target.blit(self.logo_img, self.logo_rect)
+        target.blit(self.logo_text_img, self.logo_text_rect)
+        target.blit(self.credits_surface, self.credits_rect)
+        for col, rect, flags in zip(self.scaled_columns, self.column_rects, self.column_flags):
+            target.blit(col, rect, special_flags=flags)
+
+    # Jars at their hover steps; labels brighten from `label_alpha` to
+    # opaque and rise with the jar
+    def draw_jars(self, surface, steps, label_alpha, indices=None):
+        if indices is None:
+            indices = range(len(self.jar_rects))
+        for i in indices:
+            step = steps[i]
+            jar, glow = self.hover_frames[i].frames[step]
+            rect, label_rect = self.step_rects[i][step]
+            surface.blit(jar, rect, special_flags=self.jar_flags[i])
+            if glow is not None:
+                surface.blit(glow, rect, special_flags=self.jar_hover_flags[i])
+            alpha = label_alpha + (255 - label_alpha) * step // (HOVER_STEPS - 1)
+            label = self.text_cache.render(font_path, label_font_size, jar_labels[i], (0, 0, 0), alpha, bool(self.label_flags))
+            surface.blit(label, label_rect, special_flags=self.label_flags)
+
+    def draw_dirty_jars(self, surface, dirty, steps, label_alpha):
+        for area in dirty:
+            surface.set_clip(area)
+            surface.blit(self.menu_layer, area, area)
+            self.draw_jars(surface, steps, label_alpha, area.collidelistall(self.jar_areas))
+        surface.set_clip(None)
+
+    # Starts a hover tween for every jar that gained or lost focus, from
+    # wherever its animation is now
+    def update_hover(self, now):
+        for i in range(len(self.jar_rects)):
+            target = 1.0 if i == self.focus_jar else 0.0
+            if target != self.hover_targets[i]:
+                current = self.timeline.value(f"hover_{i}", self.hover_targets[i])
+                duration = (HOVER_IN_MS if target else HOVER_OUT_MS) * abs(target - current)
+                self.timeline.add(f"hover_{i}", Tween(duration, current, target, easing=ease_out), now)
+                self.hover_targets[i] = target
+
+    def hover_steps(self):
+        return [round(self.timeline.value(f"hover_{i}", target) * (HOVER_STEPS - 1)) for i, target in enumerate(self.hover_targets)]
+
+    def jar_at(self, pos):
+        return next((i for i, rect in enumerate(self.jar_rects) if rect.collidepoint(pos)), None)
+
+    def set_focus(self, jar, now):
+        if jar != self.focus_jar:
+            if jar is not None and self.state == STATE_MENU:
+                # Feedback sounds play as the input arrives, not when the frame is drawn
+                self.audio.play("hover")
+            self.focus_jar = jar
+            self.update_hover(now)
+
+    # Left / right through the jars, wrapping around
+    def move_focus(self, step, now):
+        self.pointer_focus = False
+        if self.focus_jar is None:
+            self.set_focus(0 if step > 0 else len(self.jar_rects) - 1, now)
+        else:
+            self.set_focus((self.focus_jar + step) % len(self.jar_rects), now)
+
+    def open_jar(self, i):
+        self.audio.play("click")
+        if jar_labels[i] == "About":
+            self.state = STATE_ABOUT
+            self.timeline.cancel("overlay")
+            # Shown before its layout loads, its assets are not evicted as they come
+            self.show_screen("about")
+            self.get_about_layout()
+        elif jar_labels[i] in ["USB Saves", "HDD Saves"]:
+            self.open_saves(jar_labels[i])
+        elif jar_labels[i] == "Online DB":
+            self.open_patches()
+        elif jar_labels[i] == "Tools":
+            self.open_tools()
+        elif jar_labels[i] == "Trophies":
+            self.open_trophies()
+        elif jar_labels[i] == "Settings":
+            self.open_settings()
+
+    def get_about_layout(self):
+        size = (self.width, self.height)
+        layout = self.about_layouts.get(size)
+        if layout is None:
+            layout = AboutLayout(self, *size)
+            self.about_layouts.put(size, layout)
+        return layout
+
+    # Tween callbacks
+    def hold_intro(self):
+        self.audio.start()
+        self.timeline.add("intro", Tween(1000, 255, 0, delay=2100, on_complete=self.end_intro))
+
+    def end_intro(self):
+        self.intro_finished = True
+
+    # Menu fades in from white, then settles
+    def settle_menu(self):
+        if self.state == STATE_FADE_OUT:
+            self.state = STATE_MENU
+
+    def back_to_menu(self):
+        if self.state == STATE_RETURNING:
+            self.state = STATE_SHOW_APOLLO
+            # The pointer moved without taking the focus while the menu was away
+            if self.pointer_focus:
+                self.set_focus(self.jar_at(self.mouse_pos), self.timeline.now)
+
+    def end_shutdown(self):
+        self.running = False
+
+    # Nothing on screen changes until the next event
+    def is_idle(self):
+        if not IDLE_WAIT or self.timeline.active() or self.pending_size is not None or self.navigator.active():
+            return False
+        if self.state == STATE_MENU:
+            return self.menu_hover_drawn is not None and not self.apollo_backgrounds.pending
+        if self.state in [STATE_SAVES, STATE_PATCHES, STATE_TOOLS, STATE_TROPHIES, STATE_SETTINGS]:
+            return self.list_drawn is not None
+        return self.state == STATE_ABOUT
+
+    def open_saves(self, label):
+        self.state = STATE_SAVES
+        self.timeline.cancel("overlay")
+        self.saves_label = label
+        self.saves = []
+        self.save_list.set_count(0)
+        self.layout_lists()
+        self.list_drawn = None
+        self.scanner.scan(usb_roots if label == "USB Saves" else [hdd_saves_root])
+
+    def list_panel(self):
+        return pygame.Rect(0, 0, self.width, self.height).inflate(-2 * panel_margin, -2 * panel_margin)
+
+    def layout_lists(self):
+        panel = self.list_panel()
+        self.save_list.set_rect((panel.left + 20, panel.top + 70, panel.width - 40, panel.height - 80))
+        self.trophy_set_list.set_rect(self.save_list.rect)
+        self.trophy_list.set_rect(self.save_list.rect)
+        self.settings_list.set_rect((panel.left + 20, panel.top + 80, panel.width - 40, self.settings_list.count * setting_row_height))
+        # Patch names on the left, the selected patch's body on the right
+        self.patch_list.set_rect((panel.left + 20, panel.top + 110, int(panel.width * 0.55), panel.height - 120))
+
+    def active_list(self):
+        if self.state == STATE_TROPHIES:
+            return self.trophy_set_list if self.trophy_open is None else self.trophy_list
+        return self.save_list if self.state == STATE_SAVES else self.patch_list
+
+    # Adds newly scanned saves, keeping the list sorted by title
+    def collect_saves(self):
+        found = self.scanner.poll()
+        if found:
+            self.saves.extend(found)
+            self.saves.sort(key=lambda info: (info.title.lower(), info.path))
+            self.save_list.set_count(len(self.saves))
+        # Icons decoded in the background replace their placeholders
+        ready = self.thumbnails.poll()
+        if found or self.scanner.scanning != self.list_drawn or not self.visible_icons.isdisjoint(ready):
+            self.list_drawn = None
+
+    def scroll_list(self, pixels):
+        if self.active_list().scroll_by(pixels):
+            self.list_drawn = None
+
+    def open_tools(self):
+        self.state = STATE_TOOLS
+        self.timeline.cancel("overlay")
+        self.list_drawn = None
+        if self.snapshot_count is None:
+            self.snapshot_count = len(self.backup_store.snapshot_names())
+
+    # Finds every save first, the backup starts once the scan is complete
+    def start_backup(self):
+        if self.backup_saves is not None or (self.backup_job is not None and self.backup_job.running()):
+            return
+        self.backup_saves = []
+        self.backup_status = None
+        self.backup_scanner.scan(all_save_roots)
+        self.list_drawn = None
+
+    def collect_backup_saves(self):
+        found = self.backup_scanner.poll()
+        self.backup_saves.extend(found)
+        if not self.backup_scanner.scanning:
+            self.backup_saves.extend(self.backup_scanner.poll())
+            self.backup_job = BackupJob(self.backup_store, self.backup_saves, on_progress=lambda progress: post_progress("backup", progress))
+            self.backup_job.start()
+            self.backup_saves = None
+            self.list_drawn = None
+        elif found:
+            self.list_drawn = None
+
+    def open_settings(self):
+        self.state = STATE_SETTINGS
+        self.timeline.cancel("overlay")
+        self.layout_lists()
+        self.list_drawn = None
+
+    # Steps the selected row's value forward or back
+    def change_setting(self, step):
+        self.audio.play("click")
+        if self.setting_selected == 0:
+            self.settings.cycle_profile(step)
+        else:
+            self.settings.cycle(KNOBS[self.setting_selected - 1][0], step)
+        self.apply_settings()
+        self.list_drawn = None
+
+    # Brings everything in line with the settings, without a restart
+    def apply_settings(self):
+        settings = self.settings
+        self.fps_cap = settings.get("fps_cap")
+        smooth = settings.get("smooth_scaling")
+        if self.apollo_backgrounds is not None and self.apollo_backgrounds.smooth != smooth:
+            self.apollo_backgrounds.set_smooth(smooth)
+            self.backend.set_smooth(smooth)
+            self.refresh_menu()
+            self.menu_hover_drawn = None
+            self.panel_backdrop = None
+        self.audio.set_buffer(settings.get("audio_buffer"))
+        self.audio.sounds_enabled = settings.get("ui_sounds")
+        self.update_music()
+
+    def update_music(self):
+        self.audio.set_music(self.music_wanted and self.settings.get("music"), self.settings.get("music_volume"))
+
+    def open_trophies(self):
+        self.state = STATE_TROPHIES
+        self.timeline.cancel("overlay")
+        self.trophy_open = None
+        self.layout_lists()
+        self.list_drawn = None
+        self.trophies.refresh([trophy_root])
+
+    def collect_trophies(self):
+        sets = self.trophies.poll()
+        if sets is not None:
+            self.trophy_sets = sets
+            self.trophy_set_list.set_count(len(sets))
+        details = self.trophies.poll_details()
+        if details is not None and self.trophy_open is not None:
+            self.trophy_details = details
+            self.trophy_list.set_count(len(details))
+        if sets is not None or details is not None or self.trophies.ready() != self.list_drawn:
+            self.list_drawn = None
+
+    def open_trophy_set(self, index):
+        self.trophy_open = index
+        self.trophy_details = None
+        self.trophy_list.set_count(0)
+        self.trophy_list.scroll = 0
+        self.trophies.open(self.trophy_sets[index].path)
+        self.list_drawn = None
+
+    def open_patches(self):
+        self.state = STATE_PATCHES
+        self.timeline.cancel("overlay")
+        self.layout_lists()
+        self.list_drawn = None
+        # Re-checks the mirror for changed files, then searches the index
+        self.patchdb.build()
+        self.search_patches()
+
+    def search_patches(self):
+        self.patchdb.search(self.patch_query)
+        self.list_drawn = None
+
+    def collect_patches(self):
+        results = self.patchdb.poll()
+        if results is not None:
+            self.patches = results
+            self.patch_selected = None
+            self.patch_body = []
+            self.patch_list.set_count(len(results))
+            self.patch_list.scroll = 0
+        if results is not None or self.patchdb.ready() != self.list_drawn:
+            self.list_drawn = None
+
+    # Shows the start of a patch body, mapped from its source file
+    def select_patch(self, index):
+        self.patch_selected = index
+        try:
+            body = read_body(self.patches[index])
+        except (OSError, ValueError) as e:
+            body = f"Could not read this patch: {e}"
+        self.patch_body = [line.expandtabs(4) for line in body.splitlines()[:patch_preview_lines]]
+        self.list_drawn = None
+
+    def handle_event(self, event, now):
+        # Input is hit-tested against the window it was made in: a resize
+        # queued earlier in this batch is laid out first
+        if self.pending_size is not None and event.type in INPUT_EVENTS:
+            self.apply_resize()
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN:
+            self.handle_key(event.key, now)
+        elif event.type == pygame.MOUSEMOTION:
+            self.mouse_pos = event.pos
+            # The pointer takes the focus wherever it moves over the menu
+            if self.assets_ready and self.state in [STATE_FADE_OUT, STATE_MENU]:
+                self.pointer_focus = True
+                self.set_focus(self.jar_at(event.pos), now)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.mouse_pos = event.pos
+            if self.assets_ready and self.state in [STATE_FADE_OUT, STATE_MENU]:
+                jar = self.jar_at(event.pos)
+                if jar is not None:
+                    self.set_focus(jar, now)
+                    self.open_jar(jar)
+            elif self.state == STATE_PATCHES:
+                index = self.patch_list.row_at(event.pos)
+                if index is not None:
+                    self.select_patch(index)
+            elif self.state == STATE_SETTINGS:
+                index = self.settings_list.row_at(event.pos)
+                if index is not None:
+                    self.setting_selected = index
+                    self.change_setting(1)
+            elif self.state == STATE_TROPHIES and self.trophy_open is None:
+                index = self.trophy_set_list.row_at(event.pos)
+                if index is not None:
+                    self.open_trophy_set(index)
+        elif event.type == TASK_EVENT:
+            if event.task == "sync":
+                self.sync_status = event.progress
+                if event.progress.get("done") and self.state == STATE_PATCHES:
+                    # Pick up the changed files
+                    self.patchdb.build()
+                    self.search_patches()
+            elif event.task == "backup":
+                self.backup_status = event.progress
+                if event.progress.get("done"):
+                    self.snapshot_count = len(self.backup_store.snapshot_names())
+            self.list_drawn = None
+        elif event.type == pygame.TEXTINPUT:
+            if self.state == STATE_PATCHES:
+                self.patch_query += event.text
+                self.search_patches()
+        elif event.type == pygame.MOUSEWHEEL:
+            if self.state in [STATE_SAVES, STATE_PATCHES, STATE_TROPHIES]:
+                self.scroll_list(-event.y * self.active_list().row_height)
+        elif event.type == pygame.VIDEORESIZE:
+            # Only remember the size, a drag fires dozens of these per frame
+            self.pending_size = (event.w, event.h)
+        elif event.type == pygame.WINDOWSIZECHANGED and (event.x, event.y) != (self.width, self.height):
+            # The renderer's window only reports this one
+            self.pending_size = (event.x, event.y)
+        elif event.type == pygame.WINDOWCLOSE:
+            # With the renderer the hidden display window outlives ours, no QUIT follows
+            self.running = False
+        elif event.type == pygame.WINDOWEXPOSED:
+            # Window contents may be gone, the next menu frame is drawn in full
+            self.menu_hover_drawn = None
+            self.list_drawn = None
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Key releases go to the other window, nothing may keep repeating
+            self.navigator.reset()
+
+    # Keys from the keyboard, or standing in for a controller's D-pad and buttons
+    def handle_key(self, key, now):
+        if key == HUD_KEY:
+            self.stats.hud = not self.stats.hud
+            # Clears the overlay when hidden
+            self.menu_hover_drawn = None
+            self.list_drawn = None
+        elif self.state in [STATE_FADE_OUT, STATE_MENU] and self.assets_ready and key in [pygame.K_LEFT, pygame.K_RIGHT]:
+            self.move_focus(-1 if key == pygame.K_LEFT else 1, now)
+        elif self.state in [STATE_FADE_OUT, STATE_MENU] and self.assets_ready and key in [pygame.K_RETURN, pygame.K_KP_ENTER]:
+            if self.focus_jar is not None:
+                self.open_jar(self.focus_jar)
+        elif self.state in [STATE_SAVES, STATE_PATCHES, STATE_TROPHIES] and key in [pygame.K_UP, pygame.K_DOWN, pygame.K_PAGEUP, pygame.K_PAGEDOWN]:
+            row, page = self.active_list().row_height, self.active_list().page_height()
+            self.scroll_list({pygame.K_UP: -row, pygame.K_DOWN: row, pygame.K_PAGEUP: -page, pygame.K_PAGEDOWN: page}[key])
+        elif self.state == STATE_SETTINGS and key in [pygame.K_UP, pygame.K_DOWN]:
+            step = 1 if key == pygame.K_DOWN else -1
+            self.setting_selected = (self.setting_selected + step) % self.settings_list.count
+            self.list_drawn = None
+        elif self.state == STATE_SETTINGS and key in [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_RETURN, pygame.K_KP_ENTER]:
+            self.change_setting(-1 if key == pygame.K_LEFT else 1)
+        elif self.state == STATE_TOOLS and key in [pygame.K_RETURN, pygame.K_KP_ENTER]:
+            self.start_backup()
+        elif self.state == STATE_PATCHES and key == SYNC_KEY and self.sync_client is not None and not self.sync_client.running():
+            self.sync_client.start()
+            self.sync_status = {"checked": 0, "total": 0}
+            self.list_drawn = None
+        elif self.state == STATE_PATCHES and key == pygame.K_BACKSPACE and self.patch_query:
+            self.patch_query = self.patch_query[:-1]
+            self.search_patches()
+        elif self.state == STATE_TROPHIES and key == pygame.K_ESCAPE and self.trophy_open is not None:
+            # Back to the overview
+            self.trophy_open = None
+            self.list_drawn = None
+        elif key == pygame.K_ESCAPE:
+            if self.state in [STATE_ABOUT, STATE_SAVES, STATE_PATCHES, STATE_TOOLS, STATE_TROPHIES, STATE_SETTINGS]:
+                self.state = STATE_RETURNING
+                self.timeline.add("overlay", Tween(1500, 0, 255, on_complete=self.back_to_menu), now)
+                self.about_layouts.clear()
+                self.panel_backdrop = None
+            elif self.state in [STATE_SHOW_APOLLO, STATE_FADE_OUT, STATE_MENU]:
+                # Trigger shutdown animation
+                self.state = STATE_SHUTDOWN
+                self.timeline.cancel("overlay")
+                self.timeline.add("shutdown", Tween(self.settings.get("shutdown_ms"), 0.0, 1.0, on_complete=self.end_shutdown), now)
+                self.music_wanted = False
+                self.update_music()
+
+    def apply_resize(self):
+        self.width, self.height = self.pending_size
+        self.pending_size = None
+        self.screen = self.backend.resize((self.width, self.height))
+        if self.intro_scaled is not None:
+            self.intro_rect = self.intro_scaled.get_rect(center=(self.width // 2, self.height // 2))
+        # Rescale backgrounds and update positions
+        if self.assets_ready:
+            self.refresh_menu()
+            # Jars moved under a pointer that did not
+            if self.menu_loaded and self.pointer_focus:
+                self.set_focus(self.jar_at(self.mouse_pos), self.timeline.now)
+        self.menu_hover_drawn = None
+        self.list_drawn = None
+        self.layout_lists()
+        if self.state == STATE_ABOUT:
+            self.get_about_layout()
+
+    # Runs one frame: handles `events` (default: the pygame queue), advances
+    # transitions to `now` (default: pygame ticks), draws and presents.
+    # Returns False once the app wants to quit.
+    def step(self, events=None, now=None):
+        stats = self.stats if self.stats.enabled else None
+        if stats:
+            stats.begin()
+        if events is None:
+            events = pygame.event.get()
+        received = time.perf_counter()
+        if now is None:
+            now = pygame.time.get_ticks()
+        for event in events:
+            self.handle_event(event, now)
+            for key in self.navigator.handle_event(event, now):
+                self.handle_key(key, now)
+        for key in self.navigator.repeats(now):
+            self.handle_key(key, now)
+        if stats:
+            stats.phase("events")
+
+        # One rebuild per frame for all the resize events above
+        if self.pending_size is not None:
+            self.apply_resize()
+        self.show_screen(STATE_SCREENS[self.state])
+
+        # Swap in the smooth background once the worker has scaled it
+        if self.assets_ready and (self.width, self.height) in self.apollo_backgrounds.poll():
+            self.apollo_scaled = self.apollo_backgrounds.get((self.width, self.height))
+            if self.menu_layer is not None:
+                self.menu_layer = self.build_menu_layer()
+            self.menu_hover_drawn = None
+            self.panel_backdrop = None
+            self.list_drawn = None
+            self.loader.trim()
+
+        if self.state == STATE_SAVES:
+            self.collect_saves()
+        elif self.state == STATE_PATCHES:
+            self.collect_patches()
+        elif self.state == STATE_TROPHIES:
+            self.collect_trophies()
+        if self.backup_saves is not None:
+            self.collect_backup_saves()
+
+        # Advance transitions, finished ones drop out of the timeline
+        self.timeline.update(now)
+        if stats:
+            stats.phase("update")
+
+        dirty_rects = self.draw(now)
+        # A renderer frame is composed whole, the HUD only goes on drawn ones
+        if stats and self.stats.hud and (dirty_rects != [] or self.backend.retained):
+            stats.pause()
+            hud_rect = stats.draw_hud(self.backend, now)
+            if dirty_rects is not None and hud_rect is not None:
+                dirty_rects.append(hud_rect)
+            stats.resume()
+        if stats:
+            stats.phase("draw")
+
+        # Full frames are flipped, settled menu frames only update these rects
+        self.backend.present(dirty_rects)
+        if self.latency is not None:
+            self.latency.record(events, received, dirty_rects != [])
+        self.idle = self.is_idle()
+        if stats:
+            stats.phase("flip")
+            stats.end(now, self.state, (self.width, self.height), len(events), dirty_rects)
+        return self.running
+
+    # Draws the current state, returns the dirty rects or None for a full frame
+    def draw(self, now):
+        screen, backend, timeline, state = self.screen, self.backend, self.timeline, self.state
+        dirty_rects = None
+
+        if state == STATE_INTRO:
+            backend.fill((0, 0, 0))
+            backend.blit_alpha(self.intro_scaled, self.intro_rect, timeline.value("intro", 0))
+            if self.intro_finished and (self.assets_ready or self.loader.done(menu_assets)):
+                # The splash is not shown again, the loader may evict it
+                backend.forget(self.intro_scaled)
+                self.intro_scaled = None
+                self.show_screen("menu")
+                if not self.assets_ready:
+                    self.finish_loading()
+                self.state = STATE_SHOW_APOLLO
+
+        elif state == STATE_SHOW_APOLLO:
+            # Music starts with the menu, or as soon as the mixer is up
+            self.music_wanted = True
+            self.update_music()
+            # Draw Apollo UI from the static layer under a full white overlay
+            self.draw_menu_base(backend)
+            self.draw_jars(backend, self.hover_steps(), 22)
+            backend.overlay((255, 255, 255), 255)
+            self.menu_hover_drawn = None
+            # Transition to fade out
+            self.state = STATE_FADE_OUT
+            timeline.add("overlay", Tween(self.settings.get("fade_ms"), 255, 0, on_complete=self.settle_menu), now)
+
+        elif state in [STATE_FADE_OUT, STATE_MENU]:
+            steps = self.hover_steps()
+            settled = DIRTY_RECTS and state == STATE_MENU and self.menu_hover_drawn is not None
+            if settled and backend.retained:
+                # Menu is settled, only touch the jars whose hover step changed
+                dirty_rects = [self.jar_areas[i] for i in range(len(self.jar_areas)) if steps[i] != self.menu_hover_drawn[i]]
+                self.draw_dirty_jars(screen, dirty_rects, steps, 80)
+            elif settled and steps == self.menu_hover_drawn:
+                # The renderer only composes whole frames, an unchanged one is skipped
+                dirty_rects = []
+            else:
+                self.draw_menu_base(backend)
+                self.draw_jars(backend, steps, 80)
+                # White overlay fading out, gone once its tween has finished
+                backend.overlay((255, 255, 255), timeline.value("overlay", 0))
+            self.menu_hover_drawn = steps if state == STATE_MENU else None
+
+        elif state == STATE_ABOUT:
+            # Draw background, then the precompiled about screen
+            screen.blit(self.apollo_scaled, (0, 0))
+            self.get_about_layout().draw(screen)
+            backend.canvas()
+
+        elif state == STATE_SAVES:
+            # Redrawn only when the list, scroll or scan status changed
+            if self.list_drawn is not None:
+                return []
+            scanning = self.scanner.scanning
+            self.draw_saves(screen, scanning)
+            backend.canvas()
+            self.list_drawn = scanning
+
+        elif state == STATE_PATCHES:
+            if self.list_drawn is not None:
+                return []
+            ready = self.patchdb.ready()
+            self.draw_patches(screen, not ready)
+            backend.canvas()
+            self.list_drawn = ready
+
+        elif state == STATE_TOOLS:
+            if self.list_drawn is not None:
+                return []
+            self.draw_tools(screen)
+            backend.canvas()
+            self.list_drawn = True
+
+        elif state == STATE_SETTINGS:
+            if self.list_drawn is not None:
+                return []
+            self.draw_settings(screen)
+            backend.canvas()
+            self.list_drawn = True
+
+        elif state == STATE_TROPHIES:
+            if self.list_drawn is not None:
+                return []
+            ready = self.trophies.ready()
+            self.draw_trophies(screen, not ready)
+            backend.canvas()
+            self.list_drawn = ready
+
+        elif state == STATE_RETURNING:
+            # Fade back to Apollo
+            backend.stretch(self.apollo_scaled, pygame.Rect(0, 0, self.width, self.height))
+            backend.overlay((255, 255, 255), timeline.value("overlay", 255))
+
+        elif state == STATE_SHUTDOWN:
+            # White background with closing bars
+            backend.fill((255, 255, 255))
+            backend.blit(self.logo_img, self.logo_img.get_rect(center=(self.width // 2, self.height // 2)))
+
+            progress = timeline.value("shutdown", 1.0)
+            bar_height = int((self.height // 2) * progress)
+            # Top bar
+            backend.fill((0, 0, 0), pygame.Rect(0, 0, self.width, bar_height))
+            # Bottom bar
+            backend.fill((0, 0, 0), pygame.Rect(0, self.height - bar_height, self.width, bar_height))
+
+        return dirty_rects
+
+    # Background with the darkened panel, rebuilt when the background changes
+    def draw_panel(self, surface):
+        panel = self.list_panel()
+        if self.panel_backdrop is None or self.panel_backdrop.get_size() != (self.width, self.height):
+            self.panel_backdrop = self.apollo_scaled.copy()
+            fade_to_color(self.panel_backdrop.subsurface(panel), (0, 0, 0), 190)
+        surface.blit(self.panel_backdrop, (0, 0))
+        return panel
+
+    def draw_saves(self, surface, scanning):
+        panel = self.draw_panel(surface)
+        white = (255, 255, 255)
+
+        header = f"{self.saves_label}  -  {len(self.saves)} saves"
+        if scanning:
+            header += "  (scanning...)"
+        elif not self.saves:
+            header += "  (none found)"
+        surface.blit(self.list_text.render(font_path, label_font_size, header, white), (panel.left + 20, panel.top + 15))
+        if not scanning and self.scanner.counts:
+            counts = self.scanner.counts
+            summary = self.list_text.render(None, 20, f"{counts['parsed']} read, {counts['cached']} from the index, {counts['errors']} unreadable", (170, 170, 170))
+            surface.blit(summary, summary.get_rect(topright=(panel.right - 20, panel.top + 20)))
+
+        self.visible_icons = set()
+        self.save_list.draw(surface)
+        # Rows scrolled out of view no longer need their icons decoded
+        self.thumbnails.retain(self.visible_icons)
+
+    # One save row: icon (or a placeholder until it is decoded), title and
+    # subtitle, title id and size
+    def draw_save_row(self, surface, index, rect):
+        info = self.saves[index]
+        white, grey = (255, 255, 255), (170, 170, 170)
+        icon_rect = pygame.Rect((0, 0), save_icon_size)
+        icon_rect.midleft = (rect.left, rect.centery)
+        thumb = None
+        if info.icon:
+            self.visible_icons.add(info.icon)
+            thumb = self.thumbnails.get(info.icon)
+        if thumb is None:
+            surface.fill((60, 60, 60), icon_rect)
+        else:
+            surface.blit(thumb, thumb.get_rect(center=icon_rect.center))
+
+        surface.blit(self.list_text.render(font_path, save_font_size, info.title, white), (icon_rect.right + 16, rect.top + 4))
+        if info.subtitle:
+            surface.blit(self.list_text.render(font_path, save_subtitle_font_size, info.subtitle, grey), (icon_rect.right + 16, rect.top + 32))
+        details = self.list_text.render(font_path, save_font_size, f"{info.title_id}   {format_size(info.size)}", grey)
+        surface.blit(details, details.get_rect(midright=(rect.right, rect.centery)))
+
+    def draw_patches(self, surface, indexing):
+        panel = self.draw_panel(surface)
+        white, grey = (255, 255, 255), (170, 170, 170)
+
+        count = f"{len(self.patches)}+" if len(self.patches) >= SEARCH_LIMIT else len(self.patches)
+        header = f"Online DB  -  {count} patches"
+        if indexing:
+            header += "  (indexing...)"
+        elif not self.patches:
+            header += "  (none found)"
+        surface.blit(self.list_text.render(font_path, label_font_size, header, white), (panel.left + 20, panel.top + 15))
+        if not indexing and self.patchdb.counts:
+            counts = self.patchdb.counts
+            summary = self.list_text.render(None, 20, f"{counts['files']} files: {counts['parsed']} indexed, {counts['removed']} removed", grey)
+            surface.blit(summary, summary.get_rect(topright=(panel.right - 20, panel.top + 20)))
+        surface.blit(self.list_text.render(font_path, save_font_size, f"Search: {self.patch_query}_", grey), (panel.left + 20, panel.top + 65))
+        sync_text = self.list_text.render(None, 20, self.sync_text(), grey)
+        surface.blit(sync_text, sync_text.get_rect(topright=(panel.right - 20, panel.top + 70)))
+
+        self.patch_list.draw(surface)
+
+        # Preview of the selected patch
+        x, y = self.patch_list.rect.right + 30, self.patch_list.rect.top
+        if self.patch_selected is None:
+            if not indexing and not self.patches and not self.patch_query:
+                hint = f"Put .savepatch files in {patch_db_root}"
+                surface.blit(self.list_text.render(None, 20, hint, grey), (x, y))
+            return
+        patch = self.patches[self.patch_selected]
+        surface.set_clip(pygame.Rect(x, y, panel.right - 20 - x, panel.bottom - 10 - y))
+        surface.blit(self.list_text.render(font_path, save_font_size, patch.name, white), (x, y))
+        surface.blit(self.list_text.render(font_path, save_subtitle_font_size, f"{patch.title_id}  {patch.title}", grey), (x, y + 30))
+        for i, line in enumerate(self.patch_body):
+            surface.blit(self.list_text.render(None, 20, line, white), (x, y + 70 + i * 20))
+        surface.set_clip(None)
+
+    def draw_tools(self, surface):
+        panel = self.draw_panel(surface)
+        white, grey = (255, 255, 255), (170, 170, 170)
+        surface.blit(self.list_text.render(font_path, label_font_size, "Tools", white), (panel.left + 20, panel.top + 15))
+        lines = [
+            ("Enter: back up every HDD and USB save", white),
+            (f"Store: {backup_root}  ({self.snapshot_count} snapshots)", grey),
+            ("", grey),
+        ] + [(line, white) for line in self.backup_text()]
+        for i, (line, color) in enumerate(lines):
+            surface.blit(self.list_text.render(font_path, save_font_size, line, color), (panel.left + 20, panel.top + 80 + i * 36))
+
+    def backup_text(self):
+        if self.backup_saves is not None:
+            return [f"Finding saves... {len(self.backup_saves)}"]
+        status = self.backup_status
+        if status is None:
+            return []
+        if "error" in status:
+            return [f"Backup failed: {status['error']}"]
+        if not status.get("done"):
+            return [
+                f"Backing up {status['saves']} saves: {status['files']} files, {format_size(status['bytes'])}",
+                f"{status['new']} new files written, {status['deduplicated']} already stored, {status['unchanged']} unchanged",
+            ]
+        return [
+            f"Backed up {status['saves']} saves ({status['files']} files, {format_size(status['bytes'])}) in {status['seconds']} s, {status['mb_per_s']} MB/s",
+            f"{status['new']} new files ({format_size(status['stored'])} stored), {status['deduplicated']} already stored, {status['unchanged']} unchanged, {status['failed']} failed",
+            f"Snapshot {status['snapshot']}",
+        ]
+
+    def draw_settings(self, surface):
+        panel = self.draw_panel(surface)
+        grey = (170, 170, 170)
+        surface.blit(self.list_text.render(font_path, label_font_size, "Settings", (255, 255, 255)), (panel.left + 20, panel.top + 15))
+        self.settings_list.draw(surface)
+        hint = "Up/Down: choose   Left/Right/Enter or click: change   * differs from the profile"
+        surface.blit(self.list_text.render(None, 20, hint, grey), (panel.left + 20, self.settings_list.rect.bottom + 20))
+
+    def draw_setting_row(self, surface, index, rect):
+        white, grey = (255, 255, 255), (170, 170, 170)
+        if index == self.setting_selected:
+            surface.fill((70, 70, 70), rect)
+        if index == 0:
+            label, value = "Profile", self.settings.profile
+        else:
+            key, label, _, unit = KNOBS[index - 1]
+            value = format_value(unit, self.settings.get(key))
+            if self.settings.overridden(key):
+                value += " *"
+        surface.blit(self.list_text.render(font_path, save_font_size, label, grey), (rect.left + 10, rect.top + 10))
+        value = self.list_text.render(font_path, save_font_size, f"< {value} >", white)
+        surface.blit(value, value.get_rect(midright=(rect.right - 10, rect.centery)))
+
+    def draw_trophies(self, surface, loading):
+        panel = self.draw_panel(surface)
+        white, grey = (255, 255, 255), (170, 170, 170)
+        if self.trophy_open is None:
+            header = f"Trophies  -  {len(self.trophy_sets)} games"
+            if loading:
+                header += "  (loading...)"
+            elif not self.trophy_sets:
+                header += "  (none found)"
+            surface.blit(self.list_text.render(font_path, label_font_size, header, white), (panel.left + 20, panel.top + 15))
+            if not loading and self.trophies.counts:
+                counts = self.trophies.counts
+                summary = self.list_text.render(None, 20, f"{counts['parsed']} read, {counts['cached']} from the cache, {counts['errors']} unreadable", grey)
+                surface.blit(summary, summary.get_rect(topright=(panel.right - 20, panel.top + 20)))
+            if not loading and not self.trophy_sets:
+                hint = f"Put trophy folders (TROPCONF.SFM, TROPUSR.DAT) in {trophy_root}"
+                surface.blit(self.list_text.render(None, 20, hint, grey), self.trophy_set_list.rect.topleft)
+            self.trophy_set_list.draw(surface)
+            return
+        info = self.trophy_sets[self.trophy_open]
+        header = f"{info.title}  -  {info.earned}/{info.total}"
+        if self.trophy_details is None:
+            header += "  (loading...)"
+        surface.blit(self.list_text.render(font_path, label_font_size, header, white), (panel.left + 20, panel.top + 15))
+        self.trophy_list.draw(surface)
+
+    # One game: title and id, earned count with a progress bar, earned per grade
+    def draw_trophy_set_row(self, surface, index, rect):
+        info = self.trophy_sets[index]
+        white, grey = (255, 255, 255), (170, 170, 170)
+        surface.blit(self.list_text.render(font_path, save_font_size, info.title, white), (rect.left + 6, rect.top + 4))
+        surface.blit(self.list_text.render(font_path, save_subtitle_font_size, info.npcommid, grey), (rect.left + 6, rect.top + 32))
+        percent = info.earned * 100 // info.total if info.total else 0
+        count = self.list_text.render(font_path, save_font_size, f"{info.earned}/{info.total}  {percent}%", white)
+        surface.blit(count, count.get_rect(topright=(rect.right, rect.top + 4)))
+        bar = pygame.Rect(0, 0, 200, 6)
+        bar.topright = (rect.right, rect.top + 36)
+        surface.fill((60, 60, 60), bar)
+        surface.fill(trophy_grade_colors["G"], (bar.left, bar.top, bar.width * percent // 100, bar.height))
+        x = bar.left - 20
+        for grade in reversed("PGSB"):
+            label = self.list_text.render(font_path, save_subtitle_font_size, f"{grade} {info.grades.get(grade, 0)}", trophy_grade_colors[grade])
+            x -= label.get_width()
+            surface.blit(label, (x, rect.top + 30))
+            x -= 16
+
+    # One trophy: grade, name and description, unlock date. Hidden trophies
+    # keep their text to themselves until earned
+    def draw_trophy_row(self, surface, index, rect):
+        trophy = self.trophy_details[index]
+        white, grey = (255, 255, 255), (170, 170, 170)
+        grade_rect = pygame.Rect(rect.left + 6, rect.top + 12, 36, 36)
+        surface.fill(trophy_grade_colors.get(trophy.grade, grey), grade_rect)
+        grade = self.list_text.render(font_path, save_font_size, trophy.grade, (0, 0, 0))
+        surface.blit(grade, grade.get_rect(center=grade_rect.center))
+        if trophy.hidden and not trophy.earned:
+            name, detail = "Hidden trophy", ""
+        else:
+            name, detail = trophy.name, trophy.detail
+        surface.blit(self.list_text.render(font_path, save_font_size, name, white if trophy.earned else grey), (grade_rect.right + 16, rect.top + 4))
+        if detail:
+            surface.blit(self.list_text.render(font_path, save_subtitle_font_size, detail, grey), (grade_rect.right + 16, rect.top + 32))
+        if trophy.earned:
+            status = time.strftime("%Y-%m-%d %H:%M", time.localtime(trophy.time)) if trophy.time else "Earned"
+        else:
+            status = "Locked"
+        status = self.list_text.render(font_path, save_subtitle_font_size, status, white if trophy.earned else grey)
+        surface.blit(status, status.get_rect(midright=(rect.right, rect.centery)))
+
+    def sync_text(self):
+        status = self.sync_status
+        if self.sync_client is None:
+            return "Sync off: no sync URL set"
+        if status is None:
+            return f"F5: sync from {self.sync_url}"
+        if "error" in status:
+            return f"Sync failed: {status['error']}"
+        if status.get("done"):
+            return f"Synced: {status['fetched']} new, {status['unchanged']} unchanged, {status['removed']} removed, {status['failed']} failed"
+        return f"Syncing {status['checked']}/{status['total']}"
+
+    def draw_patch_row(self, surface, index, rect):
+        patch = self.patches[index]
+        if index == self.patch_selected:
+            surface.fill((70, 70, 70), rect)
+        surface.blit(self.list_text.render(font_path, save_subtitle_font_size, patch.title_id, (170, 170, 170)), (rect.left + 6, rect.top + 6))
+        surface.blit(self.list_text.render(font_path, save_subtitle_font_size, patch.name, (255, 255, 255)), (rect.left + 130, rect.top + 6))
+
+    # Main loop
+    def run(self):
+        while self.running:
+            # Sleep until something happens when idle, back to the FPS cap after that
+            events = wait_for_events(IDLE_TIMEOUT_MS) if self.idle else pygame.event.get()
+            self.step(events)
+            self.clock.tick(self.fps_cap)
+
+    def close(self):
+        self.stats.close()
+        if self.latency is not None:
+            print(self.latency.summary())
+            self.latency.close()
+        self.loader.shutdown()
+        self.scanner.shutdown()
+        self.thumbnails.shutdown()
+        self.patchdb.shutdown()
+        self.backup_scanner.shutdown()
+        self.trophies.shutdown()
+        self.settings.shutdown()
+        self.audio.shutdown()
+        if self.apollo_backgrounds is not None:
+            self.apollo_backgrounds.shutdown()
+        if self.asset_timings:
+            print(self.loader.report())
+        self.backend.close()
+        pygame.quit()
+
+
+# Value following a command-line flag, or None
+def arg_value(flag):
+    if flag in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+def main():
+    # --trace FILE writes one JSON line per frame, the same numbers as the F3 overlay
+    # --renderer draws through the SDL renderer, --render-driver picks one
+    # of SDL's drivers for it (e.g. software)
+    backend = "renderer" if "--renderer" in sys.argv or arg_value("--render-driver") else "surface"
+    # --latency FILE logs input-to-present latency per input, summed up on exit
+    # --asset-budget MB caps the memory kept for decoded assets
+    # --sync-url URL is the patch mirror's source, over the settings file's
+    budget = arg_value("--asset-budget")
+    app = ApolloApp(asset_timings="--asset-timings" in sys.argv, trace_path=arg_value("--trace"), backend=backend, render_driver=arg_value("--render-driver"), latency_path=arg_value("--latency"), asset_budget=int(float(budget) * 1024 * 1024) if budget else asset_budget, sync_url=arg_value("--sync-url"))
+    app.run()
+    app.close()
+    sys.exit()
+
+if __name__ == "__main__":
+    # The backup process pool re-runs this script in frozen builds
+    multiprocessing.freeze_support()
+    main()
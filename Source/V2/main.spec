@@ -8,7 +8,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('static/atlas', 'static/atlas')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,71 @@
+import pygame
+
+from assets import fit_into
+
+
+# Column configuration
+TARGET_HEIGHT = 150
+column_scales = [1.0, 1.0, 1.0, 1.1, 1.0, 1.0, 1.0]
+
+# Jar images
+jar_names = ["jar_trophy", "jar_usb", "jar_hdd", "jar_db", "jar_bup", "jar_opt", "jar_about"]
+jar_scale = 0.8
+
+# Splash and memorial photo sizes, they are decoded straight to these
+INTRO_BOX = (600, 400)
+MEMORIAL_SIZE = (300, 200)
+
+# Prepare steps, these run on the loader threads before convert_alpha()
+def scale_by(factor):
+    return lambda img: pygame.transform.scale(img, (int(img.get_width() * factor), int(img.get_height() * factor)))
+
+def scale_to_width(width):
+    return lambda img: pygame.transform.scale(img, (width, int(img.get_height() * (width / img.get_width()))))
+
+def scale_column(extra_scale):
+    return lambda img: pygame.transform.scale(img, (int(img.get_width() * (TARGET_HEIGHT / img.get_height()) * extra_scale), TARGET_HEIGHT))
+
+def make_square(img):
+    # Force cat_about to be square
+    size = min(img.get_width(), img.get_height())
+    return pygame.transform.scale(img, (size, size))
+
+# Asset manifest: name -> (file, prepare)
+asset_manifest = {
+    "intro": ("buk_scr.png", lambda img: fit_into(img, INTRO_BOX)),
+    # Scaled to the window by the app, see ScaledImageCache
+    "apollo": ("apollo.jpg", None),
+    "logo": ("logo.png", lambda img: pygame.transform.scale(img, (280, 280))),
+    "logo_text": ("logo_text.png", scale_to_width(500)),
+    # About assets, loaded on first use; help is fitted to the window
+    "help": ("help.png", None),
+    "cat_about": ("cat_about.png", make_square),
+    "top_line": ("top_line.png", None),
+    "memorial": ("leon_luna.jpg", lambda img: pygame.transform.scale(img, MEMORIAL_SIZE)),
+}
+for i in range(7):
+    asset_manifest[f"column_{i + 1}"] = (f"column_{i + 1}.png", scale_column(column_scales[i]))
+for name in jar_names:
+    asset_manifest[name] = (f"{name}.png", scale_by(jar_scale))
+    asset_manifest[f"{name}_hover"] = (f"{name}_hover.png", scale_by(jar_scale))
+
+column_assets = [f"column_{i + 1}" for i in range(7)]
+jar_hover_assets = [f"{name}_hover" for name in jar_names]
+menu_assets = ["apollo", "logo", "logo_text"] + column_assets + jar_names + jar_hover_assets
+about_assets = ["help", "cat_about", "top_line", "memorial"]
+# Stored premultiplied when translucent, drawn with BLEND_PREMULTIPLIED
+premultiplied_assets = column_assets + jar_names + jar_hover_assets
+
+# Screen showing each asset; over the memory budget, assets of screens that
+# are not on display are evicted
+asset_screens = {"intro": "intro"}
+asset_screens.update({name: "menu" for name in menu_assets})
+asset_screens.update({name: "about" for name in about_assets})
+
+# Pre-scaled menu sprites baked into one atlas by bake_atlas.py
+ATLAS_NAME = "menu_atlas"
+atlas_sprites = ["logo", "logo_text"] + column_assets + jar_names + jar_hover_assets
+
+# Scaling parameters baked into the atlas, a mismatch means it is stale
+def atlas_params():
+    return {"target_height": TARGET_HEIGHT, "column_scales": column_scales, "jar_scale": jar_scale, "logo_size": [280, 280], "logo_text_width": 500}
@@ -0,0 +1,90 @@
+# Keyboard and game controller navigation. Controllers are mapped onto the
+# keys the screens already handle: D-pad and left stick to the arrow keys,
+# A to Enter, B to Escape. A held direction repeats, from the keyboard as
+# well, with one repeat timer driven by the frame clock (SDL's own key
+# repeat would also repeat Escape and F3).
+import pygame
+
+REPEAT_DELAY_MS = 400
+REPEAT_INTERVAL_MS = 110
+STICK_DEADZONE = 0.5
+
+REPEAT_KEYS = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_PAGEUP, pygame.K_PAGEDOWN]
+BUTTON_KEYS = {0: pygame.K_RETURN, 1: pygame.K_ESCAPE}
+HAT_X_KEYS = {-1: pygame.K_LEFT, 1: pygame.K_RIGHT}
+HAT_Y_KEYS = {1: pygame.K_UP, -1: pygame.K_DOWN}
+STICK_KEYS = {0: (pygame.K_LEFT, pygame.K_RIGHT), 1: (pygame.K_UP, pygame.K_DOWN)}
+
+
+class Navigator:
+    def __init__(self):
+        pygame.joystick.init()
+        self.joysticks = {}  # instance id -> Joystick, kept open while plugged in
+        self.held = {}  # (device, control) -> key held there
+        self.repeating = None  # the most recently pressed (device, control)
+        self.repeat_at = 0
+
+    # Keys a controller event stands for. Keyboard events only start and
+    # stop repeats, the key itself is handled as it is
+    def handle_event(self, event, now):
+        if event.type == pygame.KEYDOWN:
+            if event.key in REPEAT_KEYS:
+                self.hold(("keyboard", event.key), event.key, now)
+        elif event.type == pygame.KEYUP:
+            self.release(("keyboard", event.key))
+        elif event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+            for slot in [slot for slot in self.held if slot[0] == event.instance_id]:
+                self.release(slot)
+        elif event.type == pygame.JOYBUTTONDOWN:
+            key = BUTTON_KEYS.get(event.button)
+            return [] if key is None else [key]
+        elif event.type == pygame.JOYHATMOTION:
+            x, y = event.value
+            return self.direction((event.instance_id, "hat_x"), HAT_X_KEYS.get(x), now) + self.direction((event.instance_id, "hat_y"), HAT_Y_KEYS.get(y), now)
+        elif event.type == pygame.JOYAXISMOTION and event.axis in STICK_KEYS:
+            negative, positive = STICK_KEYS[event.axis]
+            key = negative if event.value <= -STICK_DEADZONE else positive if event.value >= STICK_DEADZONE else None
+            return self.direction((event.instance_id, f"axis_{event.axis}"), key, now)
+        return []
+
+    # A control moved to `key` (None: back to center). Stick noise within
+    # the same direction presses nothing
+    def direction(self, slot, key, now):
+        if self.held.get(slot) == key:
+            return []
+        if key is None:
+            self.release(slot)
+            return []
+        self.hold(slot, key, now)
+        return [key]
+
+    def hold(self, slot, key, now):
+        self.held[slot] = key
+        self.repeating = slot
+        self.repeat_at = now + REPEAT_DELAY_MS
+
+    def release(self, slot):
+        self.held.pop(slot, None)
+        if self.repeating == slot:
+            self.repeating = None
+
+    # Keys repeated for the held direction up to time `now`
+    def repeats(self, now):
+        if self.repeating is None or now < self.repeat_at:
+            return []
+        # One repeat per frame at most, a slow frame does not queue a burst
+        self.repeat_at = max(self.repeat_at + REPEAT_INTERVAL_MS, now)
+        return [self.held[self.repeating]]
+
+    # A direction is held, the loop has to keep ticking for its repeats
+    def active(self):
+        return self.repeating is not None
+
+    # Focus moves elsewhere (another window), nothing stays held
+    def reset(self):
+        self.held.clear()
+        self.repeating = None
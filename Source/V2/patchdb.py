@@ -0,0 +1,184 @@
+# Index of a local mirror of Apollo's save-patch database: one .savepatch
+# file per title ID, each holding [Patch name] sections. The files are
+# parsed once into an SQLite index of patch names and byte ranges, later
+# runs only re-read files whose size or mtime changed. Patch bodies are
+# read through mmap when asked for, never kept in memory.
+#
+# All database work runs on a single worker thread (SQLite connections stay
+# on the thread that made them), results come back through poll().
+import mmap
+import os
+import re
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+PATCH_EXT = ".savepatch"
+INDEX_VERSION = 1
+SEARCH_LIMIT = 5000
+
+SECTION_RE = re.compile(rb"^[ \t]*\[([^\]\r\n]+)\][ \t]*\r?$", re.MULTILINE)
+
+Patch = namedtuple("Patch", "title_id title name path offset length")
+
+# The search text is matched literally, LIKE wildcards in it are escaped
+LIKE_ESCAPE = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, title_id TEXT, title TEXT, mtime INTEGER, size INTEGER);
+CREATE TABLE IF NOT EXISTS patches (file_id INTEGER, name TEXT, name_lower TEXT, offset INTEGER, length INTEGER);
+CREATE INDEX IF NOT EXISTS patches_file ON patches (file_id);
+CREATE INDEX IF NOT EXISTS files_title_id ON files (title_id);
+"""
+
+
+# (name, body offset, body length) for every [name] section of a patch file
+def parse_sections(data):
+    matches = list(SECTION_RE.finditer(data))
+    sections = []
+    for i, match in enumerate(matches):
+        start = match.end()
+        if data[start:start + 2] == b"\r\n":
+            start += 2
+        elif data[start:start + 1] == b"\n":
+            start += 1
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(data)
+        sections.append((match.group(1).strip().decode("utf-8", "replace"), start, end - start))
+    return sections
+
+# Game name from the leading comment block, if there is one
+def parse_title(data):
+    for line in data[:512].splitlines():
+        line = line.strip()
+        if line.startswith(b";"):
+            title = line.lstrip(b"; ").decode("utf-8", "replace")
+            if title:
+                return title
+        elif line:
+            break
+    return ""
+
+def patch_files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(PATCH_EXT):
+                yield os.path.join(dirpath, filename)
+
+# Reads one patch body straight out of its source file
+def read_body(patch):
+    with open(patch.path, "rb") as f:
+        if patch.length <= 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[patch.offset:patch.offset + patch.length].decode("utf-8", "replace")
+
+
+class PatchDB:
+    def __init__(self, root, index_path, notify=None):
+        self.root = root
+        self.index_path = index_path
+        self.notify = notify
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="patchdb")
+        self.conn = None  # only touched on the worker thread
+        self.building = None
+        self.searching = None
+        self.counts = {}  # files seen by the last build, parsed again, dropped from the index
+
+    def _submit(self, fn, *args):
+        future = self.pool.submit(fn, *args)
+        if self.notify is not None:
+            future.add_done_callback(lambda _: self.notify())
+        return future
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.index_path)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                self.conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS patches;")
+                self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            self.conn.executescript(SCHEMA)
+        return self.conn
+
+    # Brings the index up to date with the mirror, in the background
+    def build(self):
+        if self.building is None or self.building.done():
+            self.building = self._submit(self._build)
+
+    def _build(self):
+        conn = self._connect()
+        known = {path: (file_id, mtime, size) for file_id, path, mtime, size in conn.execute("SELECT id, path, mtime, size FROM files")}
+        counts = {"files": 0, "parsed": 0, "removed": 0}
+        seen = set()
+        with conn:
+            for path in patch_files(self.root):
+                counts["files"] += 1
+                seen.add(path)
+                try:
+                    st = os.stat(path)
+                    if path in known and known[path][1:] == (st.st_mtime_ns, st.st_size):
+                        continue
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                if path in known:
+                    conn.execute("DELETE FROM patches WHERE file_id = ?", (known[path][0],))
+                    conn.execute("DELETE FROM files WHERE id = ?", (known[path][0],))
+                title_id = os.path.splitext(os.path.basename(path))[0].upper()
+                file_id = conn.execute(
+                    "INSERT INTO files (path, title_id, title, mtime, size) VALUES (?, ?, ?, ?, ?)",
+                    (path, title_id, parse_title(data), st.st_mtime_ns, st.st_size),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO patches (file_id, name, name_lower, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    [(file_id, name, name.lower(), offset, length) for name, offset, length in parse_sections(data)],
+                )
+                counts["parsed"] += 1
+            for path, (file_id, _, _) in known.items():
+                if path not in seen:
+                    conn.execute("DELETE FROM patches WHERE file_id = ?", (file_id,))
+                    conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    counts["removed"] += 1
+        self.counts = counts
+        return counts
+
+    def ready(self):
+        return self.building is not None and self.building.done()
+
+    # Patches whose name, game title or title ID contains `keyword`, grouped
+    # by title ID. Runs on the worker, poll() returns the results
+    def search(self, keyword="", title_id=None):
+        # A search still queued behind this one is pointless now
+        if self.searching is not None:
+            self.searching.cancel()
+        self.searching = self._submit(self._search, keyword, title_id)
+
+    def _search(self, keyword, title_id):
+        sql = "SELECT f.title_id, f.title, p.name, f.path, p.offset, p.length FROM patches p JOIN files f ON f.id = p.file_id"
+        where, args = [], []
+        if keyword:
+            pattern = f"%{keyword.lower().translate(LIKE_ESCAPE)}%"
+            where.append("(p.name_lower LIKE ? ESCAPE '\\' OR lower(f.title) LIKE ? ESCAPE '\\' OR lower(f.title_id) LIKE ? ESCAPE '\\')")
+            args += [pattern, pattern, pattern]
+        if title_id:
+            where.append("f.title_id = ?")
+            args.append(title_id.upper())
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY f.title_id, p.rowid LIMIT {SEARCH_LIMIT}"
+        return [Patch(*row) for row in self._connect().execute(sql, args)]
+
+    # Results of the latest search once it has finished, otherwise None
+    def poll(self):
+        if self.searching is None or not self.searching.done():
+            return None
+        future, self.searching = self.searching, None
+        try:
+            return future.result()
+        except sqlite3.Error as e:
+            print(f"Patch search failed: {e}")
+            return []
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,254 @@
+# Applies save-patch codes to decrypted save files. A patch body (one
+# [section] of a .savepatch file) picks its target with a ":FILE" line
+# (wildcards allowed) followed by Save Wizard code lines:
+#
+#     0TXXXXXX 000000YY    write 8 bits at offset X
+#     1TXXXXXX 0000YYYY    write 16 bits
+#     2TXXXXXX YYYYYYYY    write 32 bits
+#     4TXXXXXX YYYYYYYY    write Y repeatedly (T & 7: 0 = 8, 1 = 16, 2 = 32
+#     4NNNWWWW VVVVVVVV    bits), N times, W bytes apart, adding V each time
+#     8ZZZLLLL YYYYYYYY    find the Z-th occurrence of the L bytes starting
+#     YYYYYYYY YYYYYYYY    with Y (continued on the next lines), then later
+#                          codes with T = 8 count from where it was found
+#
+# so a plain write, a fill (a 4 code that repeats one value over a range) and
+# a search-and-replace (an 8 code followed by pointer writes) all come down
+# to edits of (offset, length, bytes repeated over the length).
+#
+# Files are memory-mapped and edited through a memoryview, never read whole.
+# A batch maps every target file once and applies all its codes in that one
+# pass. Dry runs map the files copy-on-write, so they go through exactly the
+# same steps and leave the files untouched. Given PfdKeys (--keys), the
+# PARAM.PFD of every save that changed is rehashed at the end of the batch.
+import fnmatch
+import mmap
+import os
+import time
+from collections import namedtuple
+
+from pfd import PFD_NAME, format_report as format_pfd_report, load_keys, rehash_saves
+
+FILL_BLOCK = 1024 * 1024
+DIFF_PREVIEW = 16  # bytes kept per change for the report
+DIFF_LIMIT = 200  # changes kept per batch
+
+Write = namedtuple("Write", "offset data relative")
+Fill = namedtuple("Fill", "offset length pattern relative")
+Search = namedtuple("Search", "pattern occurrence")
+Code = namedtuple("Code", "name file ops")
+Change = namedtuple("Change", "save file code offset length old new")
+
+
+class PatchError(Exception):
+    pass
+
+
+def code_words(line, number):
+    words = line.split()
+    if len(words) != 2 or any(len(word) != 8 for word in words):
+        raise PatchError(f"line {number}: not a code: {line}")
+    try:
+        return int(words[0], 16), int(words[1], 16), bytes.fromhex(words[0] + words[1])
+    except ValueError:
+        raise PatchError(f"line {number}: not a code: {line}") from None
+
+# One Code per ":FILE" block of a patch body
+def parse_codes(name, body):
+    codes, target, ops = [], None, None
+    lines = [(number, line.strip()) for number, line in enumerate(body.splitlines(), 1)]
+    lines = [(number, line) for number, line in lines if line and not line.startswith(";")]
+    i = 0
+    while i < len(lines):
+        number, line = lines[i]
+        i += 1
+        if line.startswith(":"):
+            target, ops = line[1:].strip(), []
+            codes.append(Code(name, target, ops))
+            continue
+        if ops is None:
+            raise PatchError(f"line {number}: no :FILE line before the first code")
+        address, value, raw = code_words(line, number)
+        kind, relative, offset = line[0].upper(), bool(address & 0x08000000), address & 0xFFFFFF
+        if kind in "012":
+            size = 1 << int(kind)
+            ops.append(Write(offset, value.to_bytes(4, "big")[-size:], relative))
+        elif kind == "4":
+            if i >= len(lines):
+                raise PatchError(f"line {number}: 4 code without its second line")
+            count_line, step = code_words(lines[i][1], lines[i][0])[:2]
+            i += 1
+            size = 1 << ((address >> 24) & 7)
+            count, stride = (count_line >> 16) & 0xFFF, count_line & 0xFFFF
+            if step == 0 and stride == size:
+                ops.append(Fill(offset, count * size, value.to_bytes(4, "big")[-size:], relative))
+            else:
+                for n in range(count):
+                    data = ((value + n * step) & 0xFFFFFFFF).to_bytes(4, "big")[-size:]
+                    ops.append(Write(offset + n * stride, data, relative))
+        elif kind == "8":
+            occurrence, length = (address >> 16) & 0xFFF, address & 0xFFFF
+            pattern = raw[4:]
+            while len(pattern) < length:
+                if i >= len(lines):
+                    raise PatchError(f"line {number}: search data ends early")
+                pattern += code_words(lines[i][1], lines[i][0])[2]
+                i += 1
+            if length == 0:
+                raise PatchError(f"line {number}: empty search")
+            ops.append(Search(pattern[:length], max(occurrence, 1)))
+        else:
+            raise PatchError(f"line {number}: unsupported code type {kind}")
+    return codes
+
+# Turns a code's ops into absolute edits against the current file contents.
+# Nothing is written yet, so a code whose search fails or that runs past the
+# end of the file is skipped as a whole rather than half applied
+def resolve(code, mapped):
+    edits, pointer = [], 0
+    for op in code.ops:
+        if isinstance(op, Search):
+            pos = -1
+            for _ in range(op.occurrence):
+                pos = mapped.find(op.pattern, pos + 1)
+                if pos < 0:
+                    raise PatchError(f"search pattern {op.pattern.hex().upper()} not found")
+            pointer = pos
+            continue
+        offset = op.offset + (pointer if op.relative else 0)
+        data = op.data if isinstance(op, Write) else op.pattern
+        length = len(op.data) if isinstance(op, Write) else op.length
+        if offset + length > len(mapped):
+            raise PatchError(f"edit at 0x{offset:X} runs past the end of the file ({len(mapped)} bytes)")
+        edits.append((offset, length, data))
+    return edits
+
+# `pattern` repeated over view[offset:offset + length], a block at a time
+def write_edit(view, offset, length, pattern):
+    if len(pattern) == length:
+        view[offset:offset + length] = pattern
+        return
+    block = memoryview(pattern * max(1, FILL_BLOCK // len(pattern)))
+    end = offset + length
+    while offset < end:
+        n = min(len(block), end - offset)
+        view[offset:offset + n] = block[:n]
+        offset += n
+
+# Target files of a code inside a save folder
+def match_files(save, pattern):
+    try:
+        names = sorted(os.listdir(save))
+    except OSError:
+        return []
+    pattern = pattern.replace("\\", "/").upper()
+    return [name for name in names if fnmatch.fnmatchcase(name.upper(), pattern) and os.path.isfile(os.path.join(save, name))]
+
+
+# Applies `codes` to every save folder in `saves`. Returns a report with the
+# counts, the failures as (save, file, code name, reason) and the first
+# DIFF_LIMIT changes with before / after previews
+def apply_batch(codes, saves, dry_run=False, keys=None):
+    started = time.perf_counter()
+    report = {"saves": len(saves), "codes": len(codes), "files": 0, "applied": 0, "edits": 0, "bytes": 0, "failed": [], "changes": [], "dry_run": dry_run}
+    patched = []
+    for save in saves:
+        applied = report["applied"]
+        # file -> codes for it, in batch order
+        targets = {}
+        for code in codes:
+            names = match_files(save, code.file)
+            if not names:
+                report["failed"].append((save, code.file, code.name, "no such file"))
+            for name in names:
+                targets.setdefault(name, []).append(code)
+        for name, file_codes in targets.items():
+            try:
+                patch_file(save, name, file_codes, dry_run, report)
+            except (OSError, ValueError) as e:
+                report["failed"].extend((save, name, code.name, str(e)) for code in file_codes)
+        if report["applied"] > applied:
+            patched.append(save)
+    # The console rejects a patched save until its PARAM.PFD matches again
+    if keys is not None and not dry_run:
+        report["pfd"] = rehash_saves([save for save in patched if os.path.isfile(os.path.join(save, PFD_NAME))], keys)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def patch_file(save, name, codes, dry_run, report):
+    path = os.path.join(save, name)
+    with open(path, "rb" if dry_run else "r+b") as f:
+        # Copy-on-write pages for a dry run: edits land in memory only
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if dry_run else mmap.ACCESS_WRITE) as mapped:
+            view = memoryview(mapped)
+            try:
+                for code in codes:
+                    try:
+                        edits = resolve(code, mapped)
+                    except PatchError as e:
+                        report["failed"].append((save, name, code.name, str(e)))
+                        continue
+                    for offset, length, data in edits:
+                        if len(report["changes"]) < DIFF_LIMIT:
+                            preview = min(length, DIFF_PREVIEW)
+                            new = (data * (preview // len(data) + 1))[:preview]
+                            report["changes"].append(Change(save, name, code.name, offset, length, bytes(view[offset:offset + preview]), new))
+                        write_edit(view, offset, length, data)
+                        report["edits"] += 1
+                        report["bytes"] += length
+                    report["applied"] += 1
+            finally:
+                view.release()
+            if not dry_run:
+                mapped.flush()
+    report["files"] += 1
+
+def format_report(report):
+    verb = "Would apply" if report["dry_run"] else "Applied"
+    lines = [f"{verb} {report['applied']} code(s) to {report['files']} file(s) in {report['saves']} save(s): {report['edits']} edits, {report['bytes']} bytes, {report['seconds']} s"]
+    for change in report["changes"]:
+        more = "..." if change.length > len(change.new) else ""
+        lines.append(f"  {os.path.basename(change.save)}/{change.file} +0x{change.offset:08X} [{change.code}]  {change.old.hex(' ').upper()}{more} -> {change.new.hex(' ').upper()}{more}")
+    if report["edits"] > len(report["changes"]):
+        lines.append(f"  ... {report['edits'] - len(report['changes'])} more edits")
+    for save, name, code, reason in report["failed"]:
+        lines.append(f"  FAILED {os.path.basename(save)}/{name} [{code}]: {reason}")
+    if report.get("pfd") is not None:
+        lines.append(format_pfd_report(report["pfd"]))
+    return "\n".join(lines)
+
+
+def main_cli(argv=None):
+    import argparse
+    from patchdb import parse_sections
+
+    parser = argparse.ArgumentParser(description="Apply .savepatch codes to decrypted save folders")
+    parser.add_argument("patch_file", help=".savepatch file")
+    parser.add_argument("saves", nargs="+", help="save folders")
+    parser.add_argument("--code", action="append", required=True, help="name of a [section] to apply, repeatable")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    parser.add_argument("--keys", help="Python file defining pfd_keys(), rehashes the PARAM.PFD of patched saves (see pfd.py)")
+    args = parser.parse_args(argv)
+    keys = None
+    if args.keys:
+        try:
+            keys = load_keys(args.keys)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    with open(args.patch_file, "rb") as f:
+        data = f.read()
+    sections = {name: data[offset:offset + length].decode("utf-8", "replace") for name, offset, length in parse_sections(data)}
+    codes = []
+    for name in args.code:
+        if name not in sections:
+            parser.error(f"no [{name}] in {args.patch_file}")
+        try:
+            codes += parse_codes(name, sections[name])
+        except PatchError as e:
+            parser.error(f"[{name}] {e}")
+    report = apply_batch(codes, args.saves, dry_run=args.dry_run, keys=keys)
+    print(format_report(report))
+    return 1 if report["failed"] or (report.get("pfd") or {}).get("failed") else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,201 @@
+# Per-frame numbers for the performance HUD and the --trace export.
+# Blits and new surfaces are counted with a profile hook on the main thread
+# that is only installed while the HUD or a trace is on, so normal frames pay
+# nothing for it. LatencyLog (--latency) measures input to present.
+import json
+import sys
+import time
+from collections import deque
+
+import pygame
+
+HUD_REFRESH_MS = 250
+HUD_PADDING = 6
+
+SURFACE_METHODS = {"convert", "convert_alpha", "copy", "subsurface"}
+BLIT_METHODS = {"blit", "blits", "fblits"}
+
+# Inputs whose latency is measured, and how long one may wait for a frame
+# that shows something before it counts as having changed nothing
+INPUT_EVENTS = {
+    pygame.KEYDOWN: "key",
+    pygame.MOUSEBUTTONDOWN: "click",
+    pygame.MOUSEMOTION: "motion",
+    pygame.MOUSEWHEEL: "wheel",
+    pygame.TEXTINPUT: "text",
+    pygame.JOYBUTTONDOWN: "button",
+    pygame.JOYHATMOTION: "dpad",
+    pygame.JOYAXISMOTION: "stick",
+}
+LATENCY_TIMEOUT_MS = 500
+
+
+class FrameStats:
+    def __init__(self, trace_path=None):
+        self.hud = False
+        self.trace = open(trace_path, "w", encoding="utf-8", buffering=1) if trace_path else None
+        self.frame = 0
+        self.blits = 0
+        self.surfaces = 0
+        self.phases = {}
+        self.caches = {}  # name -> stats() of a cache whose hits and misses are shown
+        self.last = None
+        self.frame_starts = deque(maxlen=60)
+        self.hud_font = None
+        self.hud_surface = None
+        self.hud_updated = 0
+
+    @property
+    def enabled(self):
+        return self.hud or self.trace is not None
+
+    # Adds a cache's hit and miss counts, totals since start, to every record
+    def watch(self, name, stats):
+        self.caches[name] = stats
+
+    # Counts pygame calls that blit or return a fresh surface. pygame.Surface()
+    # itself is a type call and never reaches the hook
+    def _profile(self, frame, event, arg):
+        if event != "c_call":
+            return
+        owner = getattr(arg, "__self__", None)
+        name = arg.__name__
+        if isinstance(owner, pygame.Surface):
+            if name in BLIT_METHODS:
+                self.blits += 1
+            elif name in SURFACE_METHODS:
+                self.surfaces += 1
+        elif owner is pygame.transform or (owner is pygame.image and name == "load") or (isinstance(owner, pygame.font.Font) and name == "render"):
+            self.surfaces += 1
+
+    def begin(self):
+        self.blits = self.surfaces = 0
+        self.phases = {}
+        self.start = self.mark = time.perf_counter()
+        self.frame_starts.append(self.start)
+        sys.setprofile(self._profile)
+
+    # Closes the current phase (events, update, draw, flip)
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases[name] = (now - self.mark) * 1000
+        self.mark = now
+
+    # Stops counting, for work that belongs to the HUD rather than the frame
+    def pause(self):
+        sys.setprofile(None)
+
+    def resume(self):
+        sys.setprofile(self._profile)
+
+    def end(self, now, state, size, events, dirty_rects):
+        sys.setprofile(None)
+        record = {
+            "frame": self.frame,
+            "t": now,
+            "state": state,
+            "size": list(size),
+            "frame_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            **{f"{name}_ms": round(ms, 3) for name, ms in self.phases.items()},
+            "events": events,
+            "dirty_rects": None if dirty_rects is None else len(dirty_rects),
+            "blits": self.blits,
+            "surfaces": self.surfaces,
+        }
+        for name, stats in self.caches.items():
+            stats = stats()
+            record[f"{name}_hits"] = stats["hits"]
+            record[f"{name}_misses"] = stats["misses"]
+        self.last = record
+        self.frame += 1
+        if self.trace is not None:
+            self.trace.write(json.dumps(record) + "\n")
+
+    def fps(self):
+        if len(self.frame_starts) < 2:
+            return 0.0
+        span = self.frame_starts[-1] - self.frame_starts[0]
+        return (len(self.frame_starts) - 1) / span if span > 0 else 0.0
+
+    def hud_lines(self):
+        r = self.last
+        return [
+            f"{r['state']}  {r['size'][0]}x{r['size'][1]}",
+            f"frame {r['frame_ms']:6.2f} ms   {self.fps():5.1f} fps",
+            f"events {r.get('events_ms', 0):5.2f}  update {r.get('update_ms', 0):5.2f}",
+            f"draw {r.get('draw_ms', 0):5.2f}  flip {r.get('flip_ms', 0):5.2f}",
+            f"blits {r['blits']}  surfaces {r['surfaces']}  dirty {'full' if r['dirty_rects'] is None else r['dirty_rects']}",
+        ] + [f"{name} hits {r[f'{name}_hits']}  misses {r[f'{name}_misses']}" for name in self.caches]
+
+    # Draws the overlay in the top-right corner and returns its rect. The text
+    # is re-rendered a few times a second so it stays readable and cheap
+    def draw_hud(self, surface, now):
+        if self.last is None:
+            return None
+        if self.hud_surface is None or now - self.hud_updated >= HUD_REFRESH_MS:
+            if self.hud_font is None:
+                self.hud_font = pygame.font.Font(None, 20)
+            lines = [self.hud_font.render(line, True, (255, 255, 255)) for line in self.hud_lines()]
+            line_height = self.hud_font.get_linesize()
+            width = max(line.get_width() for line in lines) + 2 * HUD_PADDING
+            self.hud_surface = pygame.Surface((width, line_height * len(lines) + 2 * HUD_PADDING)).convert()
+            self.hud_surface.fill((20, 20, 20))
+            for i, line in enumerate(lines):
+                self.hud_surface.blit(line, (HUD_PADDING, HUD_PADDING + i * line_height))
+            self.hud_updated = now
+        rect = self.hud_surface.get_rect(topright=(surface.get_width() - 10, 10))
+        surface.blit(self.hud_surface, rect)
+        return rect
+
+    def close(self):
+        sys.setprofile(None)
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+
+# Input to present latency, one JSON line per input: from the moment the loop
+# took the event off the queue to the end of the first present after it
+# that put something on screen. pygame events carry no SDL timestamps, so
+# time spent in the queue before that is not included
+class LatencyLog:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", buffering=1)
+        self.pending = []  # (kind, detail, received, frame)
+        self.samples = {}  # kind -> latencies (ms)
+        self.unchanged = 0
+        self.frame = 0
+
+    # Once per frame, right after present(). `received` is when `events`
+    # came off the queue (perf_counter)
+    def record(self, events, received, presented):
+        now = time.perf_counter()
+        for event in events:
+            kind = INPUT_EVENTS.get(event.type)
+            if kind is not None:
+                detail = getattr(event, "key", None) or getattr(event, "button", None)
+                self.pending.append((kind, detail, received, self.frame))
+        if presented:
+            for kind, detail, start, frame in self.pending:
+                ms = (now - start) * 1000
+                self.samples.setdefault(kind, []).append(ms)
+                self.file.write(json.dumps({"input": kind, "detail": detail, "frame": frame, "frames": self.frame - frame + 1, "latency_ms": round(ms, 3)}) + "\n")
+            self.pending = []
+        else:
+            # Inputs that changed nothing on screen (e.g. motion over the background)
+            stale = [entry for entry in self.pending if (now - entry[2]) * 1000 > LATENCY_TIMEOUT_MS]
+            self.unchanged += len(stale)
+            self.pending = [entry for entry in self.pending if entry not in stale]
+        self.frame += 1
+
+    def summary(self):
+        lines = [f"{'input':<8} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"]
+        for kind, values in sorted(self.samples.items()):
+            values = sorted(values)
+            p50, p95 = values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))]
+            lines.append(f"{kind:<8} {len(values):>6} {p50:>8.2f} {p95:>8.2f} {values[-1]:>8.2f}")
+        lines.append(f"{self.unchanged + len(self.pending)} input(s) changed nothing on screen")
+        return "\n".join(lines)
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,289 @@
+# PARAM.PFD integrity tables of PS3 saves. The PFD lists every protected
+# file of a save with HMAC-SHA1 hashes of its contents, and signs its own
+# tables with more HMACs:
+#
+#     header        magic, version, IV, signature (AES encrypted: bottom
+#                   hash, top hash, hash key)
+#     hash table    capacity, reserved and used entries, then one chain
+#                   start per slot
+#     entries       file name, file key, 4 file hashes, file size
+#     signatures    one HMAC per hash table slot over the entries chained
+#                   to it
+#
+# top hash = HMAC(hash table), bottom hash = HMAC(signatures table).
+#
+# The keys involved are console and game secrets, and there is no AES here
+# to decrypt the signature with, so none of that ships: the caller passes a
+# PfdKeys that opens and seals the signature and hands out the per-file
+# keys, from Python code of its own (see load_keys(), --keys on this
+# script and on patcher.py). Everything else (streaming files through the
+# HMACs, the tables) happens in this module. Files are mapped and hashed
+# a chunk at a time from a memoryview; hashlib drops the GIL on large
+# updates, so the files of every save in a run are hashed in parallel on a
+# thread pool.
+import hashlib
+import hmac
+import importlib.util
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PFD_NAME = "PARAM.PFD"
+PFD_MAGIC = 0x50464442
+PFD_VERSIONS = [3, 4]
+HEADER = struct.Struct(">QQ16s64s")  # magic, version, table IV, encrypted signature
+HASH_TABLE = struct.Struct(">QQQ")  # capacity, reserved entries, used entries
+ENTRY = struct.Struct(">Q65s7x64s80s40xQ")  # next index, file name, key, file hashes, file size
+ENTRY_HASHES = 8 + 65 + 7 + 64  # offset of the file hashes in an entry
+HASH_SIZE = 20
+HASH_SLOTS = 4
+CHUNK_SIZE = 1024 * 1024
+
+
+# Console side of the PFD format. A keys provider subclasses this and
+# implements:
+#
+#     open(pfd)              (bottom hash, top hash, real hash key) from the
+#                            decrypted signature; for version 4 the hash key
+#                            is first derived with the keygen key
+#     file_keys(pfd, name)   HMAC keys for the 4 hash slots of one file, None
+#                            leaves a slot as is
+#
+# seal() is optional.
+class PfdKeys:
+    # Encrypted signature for new top and bottom hashes, None when the
+    # provider cannot seal; the tables are still rewritten then
+    def seal(self, pfd, bottom_hash, top_hash):
+        return None
+
+
+# Keys provider from a Python file defining pfd_keys(), which returns a
+# PfdKeys. Raises ValueError when the file does not provide one
+def load_keys(path):
+    spec = importlib.util.spec_from_file_location("pfd_keys", path)
+    if spec is None:
+        raise ValueError(f"{path} is not a Python file")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    factory = getattr(module, "pfd_keys", None)
+    if factory is None:
+        raise ValueError(f"{path} defines no pfd_keys()")
+    keys = factory()
+    if not (hasattr(keys, "open") and hasattr(keys, "file_keys")):
+        raise ValueError(f"pfd_keys() in {path} returned no keys provider")
+    return keys
+
+
+class Pfd:
+    def __init__(self, data, path=None):
+        self.data = bytearray(data)
+        self.path = path
+        magic, self.version, self.iv, self.signature = HEADER.unpack_from(self.data)
+        if magic != PFD_MAGIC or self.version not in PFD_VERSIONS:
+            raise ValueError("not a PARAM.PFD file")
+        self.capacity, self.reserved, _ = HASH_TABLE.unpack_from(self.data, HEADER.size)
+        self.slots_offset = HEADER.size + HASH_TABLE.size
+        self.entries_offset = self.slots_offset + 8 * self.capacity
+        self.signatures_offset = self.entries_offset + ENTRY.size * self.reserved
+        if self.signatures_offset + HASH_SIZE * self.capacity > len(self.data):
+            raise ValueError("PARAM.PFD tables run past the end of the file")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read(), path)
+
+    # Written next to the old file and swapped in
+    def save(self, path=None):
+        path = path or self.path
+        with open(path + ".tmp", "wb") as f:
+            f.write(self.data)
+        os.replace(path + ".tmp", path)
+
+    def entry_offset(self, index):
+        return self.entries_offset + ENTRY.size * index
+
+    # (entry index, file name, file size) of every file in the hash table
+    def files(self):
+        files = []
+        for slot in range(self.capacity):
+            for index in self.chain(slot):
+                _, name, _, _, size = ENTRY.unpack_from(self.data, self.entry_offset(index))
+                files.append((index, name.split(b"\0", 1)[0].decode("ascii", "replace"), size))
+        return files
+
+    # Entry indices chained to one hash table slot
+    def chain(self, slot):
+        index = struct.unpack_from(">Q", self.data, self.slots_offset + 8 * slot)[0]
+        seen = set()
+        while index < self.reserved and index not in seen:
+            seen.add(index)
+            yield index
+            index = struct.unpack_from(">Q", self.data, self.entry_offset(index))[0]
+
+    def file_hashes(self, index):
+        offset = self.entry_offset(index) + ENTRY_HASHES
+        return [bytes(self.data[offset + i * HASH_SIZE:offset + (i + 1) * HASH_SIZE]) for i in range(HASH_SLOTS)]
+
+    def set_file_hashes(self, index, hashes):
+        offset = self.entry_offset(index) + ENTRY_HASHES
+        for i, digest in enumerate(hashes):
+            if digest is not None:
+                self.data[offset + i * HASH_SIZE:offset + (i + 1) * HASH_SIZE] = digest
+
+    def entry_signature(self, hash_key, slot):
+        mac = hmac.new(hash_key, digestmod=hashlib.sha1)
+        for index in self.chain(slot):
+            offset = self.entry_offset(index)
+            mac.update(self.data[offset + 8:offset + ENTRY.size])
+        return mac.digest()
+
+    def signature_offset(self, slot):
+        return self.signatures_offset + HASH_SIZE * slot
+
+    def top_hash(self, hash_key):
+        return hmac.digest(hash_key, self.data[HEADER.size:self.entries_offset], "sha1")
+
+    def bottom_hash(self, hash_key):
+        return hmac.digest(hash_key, self.data[self.signatures_offset:self.signature_offset(self.capacity)], "sha1")
+
+
+# Streams `size` bytes of a file through one HMAC per key, None for no key
+def hash_file(path, size, keys):
+    macs = [hmac.new(key, digestmod=hashlib.sha1) if key else None for key in keys]
+    active = [mac for mac in macs if mac is not None]
+    if size and active:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < size:
+                raise ValueError(f"{os.path.basename(path)} is shorter than its PARAM.PFD entry")
+            view = memoryview(mapped)
+            try:
+                for pos in range(0, size, CHUNK_SIZE):
+                    chunk = view[pos:min(pos + CHUNK_SIZE, size)]
+                    for mac in active:
+                        mac.update(chunk)
+                    chunk.release()
+            finally:
+                view.release()
+    return [mac.digest() if mac is not None else None for mac in macs]
+
+
+# Rehashes (or with verify=True only checks) the PARAM.PFD of every save
+# folder in `saves`. The files of all saves share one thread pool
+def process_saves(saves, keys, verify=False, workers=None):
+    started = time.perf_counter()
+    report = {"saves": 0, "files": 0, "bytes": 0, "rehashed": 0, "unchanged": 0, "unsealed": 0, "mismatched": [], "failed": []}
+    pfds, jobs = [], []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2, thread_name_prefix="pfd") as pool:
+        for save in saves:
+            # The keys provider is the caller's code, whatever it raises
+            # fails this save only
+            try:
+                pfd = Pfd.load(os.path.join(save, PFD_NAME))
+                opened = keys.open(pfd)
+                files = [(index, name, size, keys.file_keys(pfd, name)) for index, name, size in pfd.files()]
+            except Exception as e:
+                report["failed"].append((save, PFD_NAME, str(e) or type(e).__name__))
+                continue
+            pfds.append((save, pfd, opened, bytes(pfd.data)))
+            for index, name, size, file_keys in files:
+                future = pool.submit(hash_file, os.path.join(save, name), size, file_keys)
+                jobs.append((save, pfd, index, name, size, future))
+
+        for save, pfd, index, name, size, future in jobs:
+            try:
+                hashes = future.result()
+            except (OSError, ValueError) as e:
+                report["failed"].append((save, name, str(e)))
+                continue
+            report["files"] += 1
+            report["bytes"] += size
+            stored = pfd.file_hashes(index)
+            if any(digest is not None and digest != old for digest, old in zip(hashes, stored)):
+                if verify:
+                    report["mismatched"].append((save, name))
+                else:
+                    pfd.set_file_hashes(index, hashes)
+
+    failed = {save for save, _, _ in report["failed"]}
+    for save, pfd, (bottom_hash, top_hash, hash_key), original in pfds:
+        if save in failed:
+            continue
+        report["saves"] += 1
+        # Entry signatures cover the file hashes, the bottom hash covers them
+        for slot in range(pfd.capacity):
+            signature = pfd.entry_signature(hash_key, slot)
+            offset = pfd.signature_offset(slot)
+            if pfd.data[offset:offset + HASH_SIZE] != signature:
+                if verify:
+                    report["mismatched"].append((save, f"{PFD_NAME} slot {slot}"))
+                else:
+                    pfd.data[offset:offset + HASH_SIZE] = signature
+        new_bottom, new_top = pfd.bottom_hash(hash_key), pfd.top_hash(hash_key)
+        if verify:
+            if (new_bottom, new_top) != (bottom_hash, top_hash):
+                report["mismatched"].append((save, f"{PFD_NAME} signature"))
+            continue
+        if (new_bottom, new_top) != (bottom_hash, top_hash):
+            sealed = keys.seal(pfd, new_bottom, new_top)
+            if sealed is None:
+                report["unsealed"] += 1
+            else:
+                pfd.data[HEADER.size - len(sealed):HEADER.size] = sealed
+        # A PFD already up to date is not written again
+        if pfd.data == original:
+            report["unchanged"] += 1
+            continue
+        try:
+            pfd.save()
+            report["rehashed"] += 1
+        except OSError as e:
+            report["failed"].append((save, PFD_NAME, str(e)))
+
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["mb_per_s"] = round(report["bytes"] / (1024 * 1024) / seconds, 1) if seconds > 0 else 0.0
+    return report
+
+def rehash_saves(saves, keys, workers=None):
+    return process_saves(saves, keys, False, workers)
+
+def verify_saves(saves, keys, workers=None):
+    return process_saves(saves, keys, True, workers)
+
+def format_report(report, verify=False):
+    if verify:
+        lines = [f"Verified {report['saves']} PARAM.PFD file(s) over {report['files']} files in {report['seconds']} s, {report['mb_per_s']} MB/s"]
+        for save, name in report["mismatched"]:
+            lines.append(f"  MISMATCH {os.path.basename(save)}/{name}")
+    else:
+        lines = [f"Rehashed {report['rehashed']} PARAM.PFD file(s) over {report['files']} files in {report['seconds']} s, {report['mb_per_s']} MB/s"]
+        if report["unchanged"]:
+            lines.append(f"  {report['unchanged']} PARAM.PFD file(s) already up to date")
+        if report["unsealed"]:
+            lines.append(f"  {report['unsealed']} PARAM.PFD signature(s) left to seal")
+    for save, name, reason in report["failed"]:
+        lines.append(f"  FAILED {os.path.basename(save)}/{name}: {reason}")
+    return "\n".join(lines)
+
+
+def main_cli(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rehash or verify the PARAM.PFD of decrypted save folders")
+    parser.add_argument("saves", nargs="+", help="save folders")
+    parser.add_argument("--keys", required=True, help="Python file defining pfd_keys(), see PfdKeys")
+    parser.add_argument("--verify", action="store_true", help="only check the hashes, write nothing")
+    args = parser.parse_args(argv)
+    try:
+        keys = load_keys(args.keys)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    report = process_saves(args.saves, keys, args.verify)
+    print(format_report(report, args.verify))
+    return 1 if report["failed"] or report["mismatched"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,250 @@
+# Where frames end up. Two backends with the same small set of drawing
+# operations, picked at startup:
+#
+#     SurfaceBackend   the classic path: everything is blitted on the CPU
+#                      onto the window surface, which is flipped (or only
+#                      updated in dirty rects)
+#     RendererBackend  pygame._sdl2.video: images are uploaded once as
+#                      textures, alpha, fills and scaling are done by the SDL
+#                      renderer
+#
+# Screens that draw lots of small pieces (the about screen, the lists) draw
+# into `backend.surface` as before and call canvas(); with the renderer that
+# surface is an offscreen canvas uploaded to one streaming texture.
+#
+# Both run under SDL's software renderer ("software" driver), so they can be
+# compared on a machine without a GPU, see bench.py --backend.
+import os
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    video = None
+
+from cache import LRUCache
+
+BACKENDS = ["surface", "renderer"]
+TEXTURE_LIMIT = 256  # uploaded surfaces kept, least recently drawn go first
+
+
+# Blends a surface towards a color in place with two fills. Slow on a whole
+# frame, meant for surfaces built once (the list panel backdrop)
+def fade_to_color(surface, color, alpha):
+    alpha = int(alpha)
+    if alpha <= 0:
+        return
+    keep = 255 - alpha
+    surface.fill((keep, keep, keep), special_flags=pygame.BLEND_RGB_MULT)
+    surface.fill(tuple(c * alpha // 255 for c in color), special_flags=pygame.BLEND_RGB_ADD)
+
+# Blits with a temporary surface alpha, leaving the shared surface untouched
+def blit_alpha(surface, image, pos, alpha):
+    alpha = int(alpha)
+    if alpha <= 0:
+        return
+    if alpha >= 255:
+        surface.blit(image, pos)
+        return
+    image.set_alpha(alpha)
+    surface.blit(image, pos)
+    image.set_alpha(None)
+
+
+class SurfaceBackend:
+    name = "surface"
+    # The window keeps its pixels between frames, so partial updates and
+    # pre-flattened layers pay off
+    retained = True
+
+    def __init__(self, size, title):
+        self.surface = pygame.display.set_mode(size, pygame.RESIZABLE)
+        pygame.display.set_caption(title)
+        self.overlays = {}  # color -> window-size surface of that color
+
+    def resize(self, size):
+        # pygame 2 resizes the window surface itself, set_mode is only a fallback
+        self.surface = pygame.display.get_surface()
+        if self.surface.get_size() != size:
+            self.surface = pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.overlays.clear()
+        return self.surface
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    # Scaling is done ahead of time by the image cache here
+    def set_smooth(self, smooth):
+        pass
+
+    # Nothing is uploaded, there is nothing to drop
+    def forget(self, image):
+        pass
+
+    def blit(self, image, dest, special_flags=0):
+        self.surface.blit(image, dest, special_flags=special_flags)
+
+    def blit_alpha(self, image, dest, alpha):
+        blit_alpha(self.surface, image, dest, alpha)
+
+    # `image` drawn over `rect`; here it is a copy already scaled to it
+    def stretch(self, image, rect):
+        self.surface.blit(image, rect)
+
+    def fill(self, color, rect=None):
+        self.surface.fill(color, rect)
+
+    # One alpha blit of a solid window-size layer, far cheaper than blending
+    # the frame with fills
+    def overlay(self, color, alpha):
+        layer = self.overlays.get(color)
+        if layer is None:
+            layer = self.overlays[color] = pygame.Surface(self.surface.get_size()).convert()
+            layer.fill(color)
+        blit_alpha(self.surface, layer, (0, 0), alpha)
+
+    # The window surface already is the canvas
+    def canvas(self):
+        pass
+
+    # None flips the whole frame, [] presents nothing
+    def present(self, dirty_rects):
+        if dirty_rects is None:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    def close(self):
+        pass
+
+
+class RendererBackend:
+    name = "renderer"
+    # Every frame drawn is composed from scratch
+    retained = False
+
+    def __init__(self, size, title, driver=None, smooth=True):
+        if video is None:
+            raise pygame.error("pygame._sdl2 is not available")
+        # A hidden display surface keeps convert() and convert_alpha()
+        # working, the frames go to a window of our own
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        # Read by SDL when a texture is created
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear" if smooth else "nearest"
+        self.window = video.Window(title, size, resizable=True)
+        index = -1
+        if driver is not None:
+            names = [info.name for info in video.get_drivers()]
+            if driver not in names:
+                self.window.destroy()
+                raise pygame.error(f"no {driver} renderer, have {', '.join(names)}")
+            index = names.index(driver)
+        try:
+            self.renderer = video.Renderer(self.window, index=index, accelerated=-1)
+        except pygame.error:
+            self.window.destroy()
+            raise
+        self.driver = driver or "default"
+        # id(surface) -> (surface, texture); the surface is kept so its id
+        # cannot be reused by another one while the texture is cached
+        self.textures = LRUCache(max_items=TEXTURE_LIMIT)
+        self.stretched = None  # (surface, texture) of the last stretch(), kept apart
+        self.canvas_texture = None
+        self.surface = pygame.Surface(size).convert()
+
+    def resize(self, size):
+        if self.window.size != size:
+            self.window.size = size
+        if self.surface.get_size() != size:
+            self.surface = pygame.Surface(size).convert()
+        return self.surface
+
+    def get_width(self):
+        return self.window.size[0]
+
+    # Textures keep the scale mode they were created with, so they are
+    # uploaded again
+    def set_smooth(self, smooth):
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear" if smooth else "nearest"
+        self.textures.clear()
+        self.stretched = None
+
+    # Uploaded on first use; a surface changed after that needs forget()
+    def texture(self, image):
+        entry = self.textures.get(id(image))
+        if entry is None or entry[0] is not image:
+            entry = (image, video.Texture.from_surface(self.renderer, image))
+            self.textures.put(id(image), entry)
+        return entry[1]
+
+    # Drops the texture of a surface the app lets go of; the cache holds
+    # the surface too, it is only freed once forgotten
+    def forget(self, image):
+        self.textures.pop(id(image))
+        if self.stretched is not None and self.stretched[0] is image:
+            self.stretched = None
+
+    # Textures always blend straight alpha, the app loads no premultiplied
+    # images for the renderer so special_flags are not needed
+    def blit(self, image, dest, special_flags=0):
+        texture = self.texture(image)
+        texture.draw(dstrect=pygame.Rect(dest[0], dest[1], texture.width, texture.height))
+
+    def blit_alpha(self, image, dest, alpha):
+        alpha = int(alpha)
+        if alpha <= 0:
+            return
+        texture = self.texture(image)
+        texture.alpha = min(alpha, 255)
+        texture.draw(dstrect=pygame.Rect(dest[0], dest[1], texture.width, texture.height))
+        texture.alpha = 255
+
+    # Scaled by the renderer to `rect`. Every window size brings a new copy,
+    # only the latest one keeps a texture
+    def stretch(self, image, rect):
+        if self.stretched is None or self.stretched[0] is not image:
+            self.stretched = (image, video.Texture.from_surface(self.renderer, image))
+        self.stretched[1].draw(dstrect=rect)
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_blend_mode = pygame.BLENDMODE_NONE
+        self.renderer.draw_color = (*color, 255)
+        self.renderer.fill_rect(rect or pygame.Rect((0, 0), self.window.size))
+
+    def overlay(self, color, alpha):
+        alpha = int(alpha)
+        if alpha <= 0:
+            return
+        self.renderer.draw_blend_mode = pygame.BLENDMODE_BLEND
+        self.renderer.draw_color = (*color, min(alpha, 255))
+        self.renderer.fill_rect(pygame.Rect((0, 0), self.window.size))
+
+    # Uploads what was drawn into `surface` and draws it as the frame
+    def canvas(self):
+        size = self.surface.get_size()
+        if self.canvas_texture is None or (self.canvas_texture.width, self.canvas_texture.height) != size:
+            self.canvas_texture = video.Texture(self.renderer, size, streaming=True)
+        self.canvas_texture.update(self.surface)
+        self.canvas_texture.draw()
+
+    # [] means nothing was drawn, the last frame stays on screen
+    def present(self, dirty_rects):
+        if dirty_rects != []:
+            self.renderer.present()
+
+    def close(self):
+        self.textures.clear()
+        self.stretched = None
+        self.canvas_texture = None
+        self.window.destroy()
+
+
+# The backend asked for, or the surface path when the renderer cannot start
+def create_backend(name, size, title, driver=None, smooth=True):
+    if name == "renderer":
+        try:
+            return RendererBackend(size, title, driver, smooth)
+        except pygame.error as e:
+            print(f"Renderer unavailable ({e}), drawing with surfaces")
+    return SurfaceBackend(size, title)
@@ -0,0 +1,250 @@
+# Finds PS3/PS4 save folders under a save root and reads their PARAM.SFO.
+# The scan runs on worker threads and streams SaveInfo results to the main
+# loop through poll(). An on-disk index keyed by folder mtime means a rescan
+# only parses the folders that changed since the last one.
+import glob
+import json
+import os
+import queue
+import struct
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+SFO_MAGIC = b"\0PSF"
+SFO_HEADER = struct.Struct("<4sIIII")  # magic, version, key table, data table, entries
+SFO_ENTRY = struct.Struct("<HHIII")  # key offset, format, length, max length, data offset
+SFO_UTF8 = 0x0204
+SFO_INT32 = 0x0404
+
+SFO_NAMES = [("PARAM.SFO",), ("param.sfo",), ("sce_sys", "param.sfo")]
+ICON_NAMES = [("ICON0.PNG",), ("icon0.png",), ("sce_sys", "icon0.png")]
+
+# Folders holding saves, relative to a save root: PS3/SAVEDATA/<save> and
+# savedata/<user>/<save> (or savedata/<user>/<title id>/<save>)
+PS3_SAVEDATA = ("PS3", "SAVEDATA")
+PS4_SAVEDATA = ("savedata",)
+
+INDEX_VERSION = 2
+
+SaveInfo = namedtuple("SaveInfo", "path folder title subtitle title_id size mtime icon")
+
+
+# PARAM.SFO key -> value (str for utf-8 entries, int for int32, raw bytes otherwise)
+def parse_sfo(data):
+    magic, _, key_table, data_table, count = SFO_HEADER.unpack_from(data)
+    if magic != SFO_MAGIC:
+        raise ValueError("not a PARAM.SFO file")
+    params = {}
+    for i in range(count):
+        key_offset, fmt, length, _, offset = SFO_ENTRY.unpack_from(data, SFO_HEADER.size + i * SFO_ENTRY.size)
+        key_start = key_table + key_offset
+        key = data[key_start:data.index(b"\0", key_start)].decode("ascii", "replace")
+        value = data[data_table + offset:data_table + offset + length]
+        if fmt == SFO_INT32:
+            params[key] = int.from_bytes(value[:4], "little")
+        elif fmt == SFO_UTF8:
+            params[key] = value.split(b"\0", 1)[0].decode("utf-8", "replace")
+        else:
+            params[key] = bytes(value)
+    return params
+
+# First of `names` that exists in the folder
+def find_file(path, names):
+    for parts in names:
+        file_path = os.path.join(path, *parts)
+        if os.path.isfile(file_path):
+            return file_path
+    return None
+
+def find_sfo(path):
+    return find_file(path, SFO_NAMES)
+
+def folder_size(path):
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += folder_size(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+def format_size(size):
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def read_save(path, mtime, sfo=None):
+    with open(sfo or find_sfo(path), "rb") as f:
+        params = parse_sfo(f.read())
+    folder = os.path.basename(path)
+    title = params.get("TITLE") or params.get("MAINTITLE") or folder
+    subtitle = params.get("SUB_TITLE") or params.get("SUBTITLE") or ""
+    title_id = params.get("TITLE_ID") or str(params.get("SAVEDATA_DIRECTORY") or folder)[:9]
+    icon = find_file(path, ICON_NAMES)
+    return SaveInfo(path, folder, " ".join(title.split()), " ".join(subtitle.split()), title_id, folder_size(path), mtime, icon)
+
+def subdirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return [(entry.path, entry.stat().st_mtime_ns) for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+# Save roots on mounted removable drives
+def usb_roots():
+    if os.name == "nt":
+        candidates = [f"{letter}:\\" for letter in "DEFGHIJKLMNOPQRSTUVWXYZ"]
+    else:
+        candidates = glob.glob("/media/*/*") + glob.glob("/run/media/*/*") + glob.glob("/media/*") + glob.glob("/Volumes/*")
+    return [root for root in candidates if any(os.path.isdir(os.path.join(root, *layout)) for layout in (PS3_SAVEDATA, PS4_SAVEDATA))]
+
+
+class SaveScanner:
+    def __init__(self, index_path, workers=4, notify=None):
+        self.index_path = index_path
+        self.notify = notify
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="saves")
+        self.lock = threading.Lock()
+        self.index = None  # path -> SaveInfo fields, loaded by the first scan
+        self.results = queue.SimpleQueue()
+        self.generation = 0
+        self.scanning = False
+        self.counts = {}  # saves of the latest scan taken from the index, parsed, unreadable
+
+    # Starts scanning `roots` (a list, or a function returning one, so drive
+    # detection also happens off the main thread). Results of an earlier scan
+    # still in flight are dropped
+    def scan(self, roots):
+        with self.lock:
+            self.generation += 1
+            self.counts = {"cached": 0, "parsed": 0, "errors": 0}
+        self.scanning = True
+        threading.Thread(target=self._scan, args=(roots, self.generation), name="saves-scan", daemon=True).start()
+
+    def _emit(self, generation, info):
+        was_empty = self.results.empty()
+        self.results.put((generation, info))
+        # One wake-up per batch, the main loop drains everything queued
+        if was_empty and self.notify is not None:
+            self.notify()
+
+    # Pool threads count concurrently, an older scan's stragglers not at all
+    def _count(self, generation, key):
+        with self.lock:
+            if generation == self.generation:
+                self.counts[key] += 1
+
+    def _read(self, path, mtime, generation, sfo):
+        try:
+            info = read_save(path, mtime, sfo)
+        except (OSError, ValueError, struct.error):
+            self._count(generation, "errors")
+            return
+        self._count(generation, "parsed")
+        with self.lock:
+            self.index[path] = info._asdict()
+        self._emit(generation, info)
+
+    # (folder, mtime, may hold title id folders) for every candidate save folder
+    def _candidates(self, root):
+        for path, mtime in subdirs(os.path.join(root, *PS3_SAVEDATA)):
+            yield path, mtime, False
+        for user, _ in subdirs(os.path.join(root, *PS4_SAVEDATA)):
+            for path, mtime in subdirs(user):
+                yield path, mtime, True
+
+    def _cached(self, path, mtime):
+        with self.lock:
+            record = self.index.get(path)
+        if record is not None and record["mtime"] == mtime:
+            return SaveInfo(**record)
+        return None
+
+    # Unchanged folders come straight from the index, changed ones are parsed
+    # on the pool
+    def _visit(self, path, mtime, nested, generation, seen, futures):
+        info = self._cached(path, mtime)
+        if info is not None:
+            seen.add(path)
+            self._count(generation, "cached")
+            self._emit(generation, info)
+            return
+        sfo = find_sfo(path)
+        if sfo is not None:
+            seen.add(path)
+            futures.append(self.pool.submit(self._read, path, mtime, generation, sfo))
+        elif nested:
+            # savedata/<user>/<title id>/<save>
+            for sub_path, sub_mtime in subdirs(path):
+                self._visit(sub_path, sub_mtime, False, generation, seen, futures)
+
+    def _scan(self, roots, generation):
+        with self.lock:
+            if self.index is None:
+                self.index = self.load_index()
+        roots = [os.path.abspath(root) for root in (roots() if callable(roots) else roots)]
+        futures, seen = [], set()
+        for root in roots:
+            for path, mtime, nested in self._candidates(root):
+                if generation != self.generation:
+                    break
+                self._visit(path, mtime, nested, generation, seen, futures)
+        wait(futures)
+        if generation == self.generation:
+            # Forget saves that disappeared from the scanned roots
+            with self.lock:
+                for path in [path for path in self.index if path not in seen and any(path.startswith(root + os.sep) for root in roots)]:
+                    del self.index[path]
+            self.save_index()
+            self.scanning = False
+            if self.notify is not None:
+                self.notify()
+
+    # New results for the latest scan, in arrival order
+    def poll(self):
+        found = []
+        while not self.results.empty():
+            generation, info = self.results.get()
+            if generation == self.generation:
+                found.append(info)
+        return found
+
+    def load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("saves", {})
+
+    # Written to a temp file of its own first, so a crash never leaves half
+    # an index and two writers never share one
+    def save_index(self):
+        with self.lock:
+            data = {"version": INDEX_VERSION, "saves": dict(self.index)}
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.index_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.index_path) + ".", suffix=".tmp", dir=directory)
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not write the save index: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def shutdown(self):
+        self.generation += 1
+        self.pool.shutdown(wait=False, cancel_futures=True)
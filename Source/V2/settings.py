@@ -0,0 +1,131 @@
+# Render and audio settings: a profile, plus overrides for single knobs,
+# kept in a small JSON file. Reading it once at startup is cheap; writes go
+# to a worker thread and land atomically, so changing a setting never waits
+# on the disk.
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+SETTINGS_VERSION = 1
+
+# Balanced matches the behaviour the app always had
+PROFILES = {
+    "Low-Power": {"fps_cap": 30, "smooth_scaling": False, "fade_ms": 1500, "shutdown_ms": 1500, "music": False, "music_volume": 0.5, "ui_sounds": False, "audio_buffer": 2048},
+    "Balanced": {"fps_cap": 60, "smooth_scaling": True, "fade_ms": 5000, "shutdown_ms": 4000, "music": True, "music_volume": 1.0, "ui_sounds": True, "audio_buffer": 512},
+    "Quality": {"fps_cap": 120, "smooth_scaling": True, "fade_ms": 5000, "shutdown_ms": 4000, "music": True, "music_volume": 1.0, "ui_sounds": True, "audio_buffer": 256},
+}
+PROFILE_NAMES = ["Low-Power", "Balanced", "Quality"]
+DEFAULT_PROFILE = "Balanced"
+
+# (key, label, choices, unit) in screen order
+KNOBS = [
+    ("fps_cap", "Frame rate cap", [30, 60, 120, 144], "fps"),
+    ("smooth_scaling", "Background scaling", [True, False], "smooth"),
+    ("fade_ms", "Menu fade-in", [1500, 3000, 5000], "ms"),
+    ("shutdown_ms", "Shutdown animation", [1500, 2500, 4000], "ms"),
+    ("music", "Background music", [True, False], "onoff"),
+    ("music_volume", "Music volume", [0.25, 0.5, 0.75, 1.0], "percent"),
+    ("ui_sounds", "Interface sounds", [True, False], "onoff"),
+    # Smaller buffers cut sound latency, bigger ones wake the CPU less often
+    ("audio_buffer", "Audio buffer", [256, 512, 1024, 2048], "samples"),
+]
+KNOB_CHOICES = {key: choices for key, _, choices, _ in KNOBS}
+
+
+def format_value(unit, value):
+    if unit == "fps":
+        return f"{value} fps"
+    if unit == "ms":
+        return f"{value / 1000:.1f} s"
+    if unit == "samples":
+        return f"{value} samples"
+    if unit == "percent":
+        return f"{value * 100:.0f}%"
+    if unit == "smooth":
+        return "Smooth" if value else "Fast"
+    return "On" if value else "Off"
+
+
+class Settings:
+    def __init__(self, path=None):
+        self.path = path  # None keeps everything in memory
+        self.profile = DEFAULT_PROFILE
+        self.overrides = {}
+        # HTTP source of the patch mirror, set by hand in the file; None: no sync
+        self.sync_url = None
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings")
+        self.saving = None
+        self.load()
+
+    def get(self, key):
+        if key in self.overrides:
+            return self.overrides[key]
+        return PROFILES[self.profile][key]
+
+    def overridden(self, key):
+        return key in self.overrides
+
+    # Picking a profile drops the overrides made on top of the previous one
+    def set_profile(self, name):
+        self.profile = name
+        self.overrides = {}
+        self.save()
+
+    def set(self, key, value):
+        if value == PROFILES[self.profile][key]:
+            self.overrides.pop(key, None)
+        else:
+            self.overrides[key] = value
+        self.save()
+
+    def cycle_profile(self, step):
+        index = PROFILE_NAMES.index(self.profile)
+        self.set_profile(PROFILE_NAMES[(index + step) % len(PROFILE_NAMES)])
+
+    def cycle(self, key, step):
+        choices = KNOB_CHOICES[key]
+        value = self.get(key)
+        index = choices.index(value) + step if value in choices else 0
+        self.set(key, choices[index % len(choices)])
+
+    def load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != SETTINGS_VERSION:
+            return
+        if data.get("profile") in PROFILES:
+            self.profile = data["profile"]
+        # Unknown knobs and values outside their choices are ignored
+        overrides = data.get("overrides")
+        if isinstance(overrides, dict):
+            self.overrides = {key: value for key, value in overrides.items() if key in KNOB_CHOICES and value in KNOB_CHOICES[key]}
+        if isinstance(data.get("sync_url"), str) and data["sync_url"]:
+            self.sync_url = data["sync_url"]
+
+    # Writes the current values in the background. A write still queued
+    # behind a running one is replaced, only the latest values matter
+    def save(self):
+        if self.path is None:
+            return
+        if self.saving is not None:
+            self.saving.cancel()
+        self.saving = self.pool.submit(self._write, {"version": SETTINGS_VERSION, "profile": self.profile, "overrides": dict(self.overrides), "sync_url": self.sync_url})
+
+    def _write(self, data):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not write the settings: {e}")
+
+    # Waits for the last write, settings changed just before quitting stick
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,228 @@
+# Refreshes the local patch mirror from an HTTP source. The source serves a
+# manifest (one file path per line, relative to the base URL) next to the
+# .savepatch files. Every file is requested with the ETag / Last-Modified of
+# the last sync, so an unchanged file costs one 304 response. A small pool of
+# workers each keep one keep-alive connection for the whole run.
+import http.client
+import json
+import os
+import posixpath
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MANIFEST_NAME = "patches.txt"
+STATE_VERSION = 1
+TIMEOUT = 15
+CHUNK_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 0.05  # seconds between progress callbacks
+
+
+class SyncError(Exception):
+    pass
+
+
+# Mirror-relative path for a manifest entry, None for anything that would
+# land outside the mirror
+def safe_name(name):
+    name = posixpath.normpath(name.strip().replace("\\", "/"))
+    if not name or name.startswith(("/", "..")) or ":" in name or name == ".":
+        return None
+    return name
+
+
+class SyncClient:
+    def __init__(self, base_url, mirror_root, state_path, workers=4, on_progress=None):
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme not in ["http", "https"]:
+            raise ValueError(f"unsupported sync URL: {base_url}")
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path if url.path.endswith("/") else url.path + "/"
+        self.mirror_root = mirror_root
+        self.state_path = state_path
+        self.workers = workers
+        self.on_progress = on_progress
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.thread = None
+        self.result = None
+        self.last_progress = 0.0
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # Syncs on a background thread, on_progress(dict) reports along the way
+    def start(self):
+        if not self.running():
+            self.result = None
+            self.thread = threading.Thread(target=self._run, name="patch-sync", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        started = time.perf_counter()
+        # Whatever goes wrong, the final progress event is still posted
+        try:
+            self.result = self.sync()
+        except Exception as e:
+            self.result = {"error": str(e) or type(e).__name__}
+        self.result["seconds"] = round(time.perf_counter() - started, 2)
+        self._progress({**self.result, "done": True}, force=True)
+
+    def _progress(self, progress, force=False):
+        now = time.perf_counter()
+        if self.on_progress is not None and (force or now - self.last_progress >= PROGRESS_INTERVAL):
+            self.last_progress = now
+            self.on_progress(progress)
+
+    # One connection per worker thread, reused for every request it makes
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.connection_class(self.host, self.port, timeout=TIMEOUT)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    # Sends a GET and returns the response with its body still unread. A
+    # keep-alive connection the server closed in the meantime is retried once
+    def _get(self, name, headers):
+        path = self.base_path + urllib.parse.quote(name)
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("GET", path, headers=headers)
+                return conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()  # http.client reconnects on the next request
+                if attempt:
+                    raise
+
+    @staticmethod
+    def _conditional_headers(meta):
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    @staticmethod
+    def _validators(response):
+        return {"etag": response.getheader("ETag"), "last_modified": response.getheader("Last-Modified")}
+
+    # Returns (status, validators, bytes written)
+    def _fetch(self, name, meta):
+        path = os.path.join(self.mirror_root, *name.split("/"))
+        headers = self._conditional_headers(meta) if meta and os.path.exists(path) else {}
+        response = self._get(name, headers)
+        if response.status == 304:
+            response.read()
+            return 304, meta, 0
+        if response.status != 200:
+            response.read()
+            raise SyncError(f"{name}: HTTP {response.status}")
+        # Streamed to a temp file and swapped in, readers never see half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        written = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # A download cut short leaves nothing behind
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return 200, self._validators(response), written
+
+    def _fetch_manifest(self, state):
+        response = self._get(MANIFEST_NAME, self._conditional_headers(state.get("manifest", {})))
+        body = response.read()
+        if response.status == 304:
+            if "files" not in state.get("manifest", {}):
+                raise SyncError(f"{MANIFEST_NAME}: HTTP 304 with no cached copy")
+            return state["manifest"]["files"], state["manifest"]
+        if response.status != 200:
+            raise SyncError(f"{MANIFEST_NAME}: HTTP {response.status}")
+        names = [safe_name(line) for line in body.decode("utf-8", "replace").splitlines() if line.strip() and not line.startswith("#")]
+        files = sorted({name for name in names if name is not None})
+        return files, {**self._validators(response), "files": files}
+
+    def sync(self):
+        self.last_progress = 0.0
+        state = self.load_state()
+        known = state.get("files", {})
+        try:
+            files, manifest = self._fetch_manifest(state)
+            counts = {"total": len(files), "checked": 0, "fetched": 0, "unchanged": 0, "removed": 0, "failed": 0, "bytes": 0}
+            synced = {}
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sync") as pool:
+                futures = {pool.submit(self._fetch, name, known.get(name)): name for name in files}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        status, meta, written = future.result()
+                    except (SyncError, OSError, http.client.HTTPException):
+                        counts["failed"] += 1
+                        if name in known:
+                            synced[name] = known[name]
+                    else:
+                        counts["fetched" if status == 200 else "unchanged"] += 1
+                        counts["bytes"] += written
+                        synced[name] = meta
+                    counts["checked"] += 1
+                    self._progress(dict(counts))
+        finally:
+            self.close_connections()
+
+        # Files dropped from the source go from the mirror too
+        for name in set(known) - set(files):
+            try:
+                os.remove(os.path.join(self.mirror_root, *name.split("/")))
+                counts["removed"] += 1
+            except OSError:
+                pass
+        self.save_state({"version": STATE_VERSION, "manifest": manifest, "files": synced})
+        return counts
+
+    def close_connections(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+    # The last sync's state, or {} (a full sync) when it is missing, from
+    # another version or not shaped like one save_state() writes
+    def load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+            return {}
+        manifest, files = state.get("manifest"), state.get("files")
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), list) or not all(isinstance(name, str) for name in manifest["files"]):
+            return {}
+        if not isinstance(files, dict) or not all(isinstance(meta, dict) for meta in files.values()):
+            return {}
+        return state
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
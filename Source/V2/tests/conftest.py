@@ -0,0 +1,5 @@
+# The app's modules are imported as top-level modules, the way main.py does
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+from patchdb import PatchDB
+
+
+def make_db(tmp_path, files):
+    root = tmp_path / "patches"
+    root.mkdir()
+    for name, text in files.items():
+        (root / name).write_text(text, encoding="utf-8")
+    db = PatchDB(str(root), str(tmp_path / "index" / "patches.db"))
+    db.build()
+    db.building.result()
+    return db
+
+
+def search(db, keyword):
+    db.search(keyword)
+    return sorted(patch.name for patch in db.searching.result())
+
+
+def test_search_matches_substrings(tmp_path):
+    db = make_db(tmp_path, {"BLUS00001.savepatch": "; Some Game\n[Max Money]\n80010000 00000000\n[Max Level]\n80010000 00000004\n"})
+    try:
+        assert search(db, "money") == ["Max Money"]
+        assert search(db, "max") == ["Max Level", "Max Money"]
+        assert search(db, "some game") == ["Max Level", "Max Money"]
+    finally:
+        db.shutdown()
+
+
+def test_search_treats_like_wildcards_literally(tmp_path):
+    db = make_db(tmp_path, {"BLUS00001.savepatch": "[Max Money]\n00\n[100% Completion]\n00\n[Unlock_All]\n00\n[Path C:\\saves]\n00\n"})
+    try:
+        assert search(db, "%") == ["100% Completion"]
+        assert search(db, "_") == ["Unlock_All"]
+        assert search(db, "_x") == []
+        assert search(db, "\\") == ["Path C:\\saves"]
+    finally:
+        db.shutdown()
@@ -0,0 +1,116 @@
+import pytest
+
+from patcher import Fill, PatchError, Search, Write, apply_batch, parse_codes
+
+
+def make_save(tmp_path, data, name="DATA.BIN"):
+    save = tmp_path / "SAVE"
+    save.mkdir()
+    (save / name).write_bytes(data)
+    return save
+
+
+def test_parse_plain_writes():
+    (code,) = parse_codes("Max", ":DATA.BIN\n00000010 000000AB\n10000020 0000ABCD\n; comment\n20000030 AABBCCDD\n")
+    assert code.file == "DATA.BIN"
+    assert code.ops == [Write(0x10, b"\xAB", False), Write(0x20, b"\xAB\xCD", False), Write(0x30, b"\xAA\xBB\xCC\xDD", False)]
+
+
+def test_parse_pointer_write_is_relative():
+    (code,) = parse_codes("Max", ":*\n28000004 01020304\n")
+    assert code.ops == [Write(4, b"\x01\x02\x03\x04", True)]
+
+
+def test_parse_fill_and_stepped_multi_write():
+    (code,) = parse_codes("Fill", ":DATA.BIN\n42000000 11223344\n00040004 00000000\n40000000 00000001\n00030002 00000001\n")
+    assert code.ops == [
+        Fill(0, 16, b"\x11\x22\x33\x44", False),
+        Write(0, b"\x01", False),
+        Write(2, b"\x02", False),
+        Write(4, b"\x03", False),
+    ]
+
+
+def test_parse_search_across_lines():
+    (code,) = parse_codes("Find", ":DATA.BIN\n80020006 DEADBEEF\nCAFE0000 00000000\n")
+    assert code.ops == [Search(b"\xDE\xAD\xBE\xEF\xCA\xFE", 2)]
+
+
+def test_parse_one_code_per_file_block():
+    codes = parse_codes("Both", ":A.BIN\n00000000 00000001\n:B.BIN\n00000000 00000002\n")
+    assert [(code.file, len(code.ops)) for code in codes] == [("A.BIN", 1), ("B.BIN", 1)]
+
+
+@pytest.mark.parametrize("body", [
+    "00000000 00000001\n",  # no :FILE line
+    ":DATA.BIN\n0000000 00000001\n",  # short word
+    ":DATA.BIN\n0000000G 00000001\n",  # not hex
+    ":DATA.BIN\n00000000\n",  # one word
+    ":DATA.BIN\n30000000 00000001\n",  # unsupported type
+    ":DATA.BIN\n42000000 11223344\n",  # 4 code without its second line
+    ":DATA.BIN\n80010008 DEADBEEF\n",  # search data ends early
+    ":DATA.BIN\n80010000 00000000\n",  # empty search
+])
+def test_parse_rejects_malformed_lines(body):
+    with pytest.raises(PatchError):
+        parse_codes("Bad", body)
+
+
+def test_missing_search_pattern_is_reported(tmp_path):
+    data = bytes(range(64))
+    save = make_save(tmp_path, data)
+    codes = parse_codes("Find", ":DATA.BIN\n80010004 DEADBEEF\n28000000 00000000\n")
+    report = apply_batch(codes, [str(save)])
+    assert report["applied"] == 0
+    assert [(name, reason) for _, name, _, reason in report["failed"]] == [("DATA.BIN", "search pattern DEADBEEF not found")]
+    assert (save / "DATA.BIN").read_bytes() == data
+
+
+def test_edit_past_the_end_is_reported_and_skips_the_whole_code(tmp_path):
+    data = bytes(16)
+    save = make_save(tmp_path, data)
+    codes = parse_codes("Far", ":DATA.BIN\n00000000 000000FF\n20000010 11223344\n")
+    report = apply_batch(codes, [str(save)])
+    assert report["applied"] == 0
+    assert "runs past the end" in report["failed"][0][3]
+    assert (save / "DATA.BIN").read_bytes() == data
+
+
+def test_missing_target_file_is_reported(tmp_path):
+    save = make_save(tmp_path, bytes(4))
+    report = apply_batch(parse_codes("Other", ":OTHER.BIN\n00000000 00000001\n"), [str(save)])
+    assert report["failed"] == [(str(save), "OTHER.BIN", "Other", "no such file")]
+
+
+def test_dry_run_leaves_the_file_untouched(tmp_path):
+    data = bytes(range(256)) * 4
+    save = make_save(tmp_path, data)
+    codes = parse_codes("Max", ":DATA.BIN\n20000000 FFFFFFFF\n42000010 AAAAAAAA\n00100004 00000000\n")
+    report = apply_batch(codes, [str(save)], dry_run=True)
+    assert report["applied"] == 1 and report["edits"] == 2
+    assert report["changes"][0].new == b"\xFF\xFF\xFF\xFF"
+    assert (save / "DATA.BIN").read_bytes() == data
+
+
+def test_write_fill_and_search_replace_round_trip(tmp_path):
+    data = bytearray(64)
+    data[40:44] = b"\xDE\xAD\xBE\xEF"
+    save = make_save(tmp_path, bytes(data))
+    body = (
+        ":DATA.BIN\n"
+        "00000000 00000012\n"
+        "41000004 00001234\n"
+        "00040002 00000000\n"
+        "80010004 DEADBEEF\n"
+        "28000000 CAFEBABE\n"
+        "18000004 00005678\n"
+    )
+    report = apply_batch(parse_codes("All", body), [str(save)])
+    assert report["failed"] == []
+    assert report["applied"] == 1
+    expected = bytearray(data)
+    expected[0] = 0x12
+    expected[4:12] = b"\x12\x34" * 4
+    expected[40:44] = b"\xCA\xFE\xBA\xBE"
+    expected[44:46] = b"\x56\x78"
+    assert (save / "DATA.BIN").read_bytes() == bytes(expected)
@@ -0,0 +1,94 @@
+import os
+import struct
+
+from pfd import ENTRY, HASH_SIZE, HASH_TABLE, HEADER, PFD_MAGIC, PFD_NAME, PfdKeys, rehash_saves, verify_saves
+
+HASH_KEY = b"h" * 20
+
+
+# Keeps the top and bottom hashes in the clear where the encrypted
+# signature goes, and gives every file the same keys
+class StubKeys(PfdKeys):
+    def open(self, pfd):
+        return bytes(pfd.signature[:HASH_SIZE]), bytes(pfd.signature[HASH_SIZE:2 * HASH_SIZE]), HASH_KEY
+
+    def file_keys(self, pfd, name):
+        return [b"f" * 20, None, b"g" * 20, None]
+
+    def seal(self, pfd, bottom_hash, top_hash):
+        return (bottom_hash + top_hash).ljust(64, b"\0")
+
+
+# A PARAM.PFD listing DATA.BIN and ICON.BIN, with zeroed hashes
+def make_save(path, files={"DATA.BIN": bytes(range(256)) * 8, "ICON.BIN": b"icon" * 100}):
+    os.makedirs(path)
+    capacity = reserved = len(files)
+    data = HEADER.pack(PFD_MAGIC, 3, bytes(16), bytes(64))
+    data += HASH_TABLE.pack(capacity, reserved, len(files)) + b"".join(struct.pack(">Q", slot) for slot in range(capacity))
+    for name, contents in files.items():
+        data += ENTRY.pack(reserved, name.encode(), bytes(64), bytes(80), len(contents))
+        with open(os.path.join(path, name), "wb") as f:
+            f.write(contents)
+    data += bytes(HASH_SIZE * capacity)
+    with open(os.path.join(path, PFD_NAME), "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_rehash_then_verify_round_trip(tmp_path):
+    save = make_save(tmp_path / "SAVE")
+    keys = StubKeys()
+    assert verify_saves([save], keys)["mismatched"]
+
+    report = rehash_saves([save], keys)
+    assert (report["rehashed"], report["unsealed"], report["files"], report["failed"]) == (1, 0, 2, [])
+    report = verify_saves([save], keys)
+    assert report["mismatched"] == [] and report["failed"] == []
+
+    # Nothing changed, nothing is written
+    pfd = read(os.path.join(save, PFD_NAME))
+    report = rehash_saves([save], keys)
+    assert (report["rehashed"], report["unchanged"]) == (0, 1)
+    assert read(os.path.join(save, PFD_NAME)) == pfd
+
+
+def test_verify_catches_a_changed_file_byte(tmp_path):
+    save = make_save(tmp_path / "SAVE")
+    rehash_saves([save], StubKeys())
+    path = os.path.join(save, "DATA.BIN")
+    data = bytearray(read(path))
+    data[100] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+    assert verify_saves([save], StubKeys())["mismatched"] == [(save, "DATA.BIN")]
+
+
+def test_verify_catches_a_changed_table_byte(tmp_path):
+    save = make_save(tmp_path / "SAVE")
+    rehash_saves([save], StubKeys())
+    path = os.path.join(save, PFD_NAME)
+    data = bytearray(read(path))
+    data[HEADER.size + HASH_TABLE.size + 16 + 20] ^= 0x01  # padding of the first entry's file name field
+    with open(path, "wb") as f:
+        f.write(data)
+    assert verify_saves([save], StubKeys())["mismatched"]
+
+
+def test_keys_provider_error_fails_only_that_save(tmp_path):
+    good = make_save(tmp_path / "GOOD")
+    bad = make_save(tmp_path / "BAD")
+
+    class PickyKeys(StubKeys):
+        def file_keys(self, pfd, name):
+            if pfd.path.startswith(bad):
+                raise KeyError(name)
+            return super().file_keys(pfd, name)
+
+    report = rehash_saves([bad, good], PickyKeys())
+    assert report["rehashed"] == 1
+    assert [save for save, _, _ in report["failed"]] == [bad]
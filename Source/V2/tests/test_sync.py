@@ -0,0 +1,72 @@
+import functools
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+from sync import MANIFEST_NAME, STATE_VERSION, SyncClient
+
+
+@pytest.fixture
+def server(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / MANIFEST_NAME).write_text("BLUS00001.savepatch\n", encoding="utf-8")
+    (source / "BLUS00001.savepatch").write_text("[Max Money]\n00\n", encoding="utf-8")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(source))
+    handler.log_message = lambda *args: None
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run(client):
+    events = []
+    client.on_progress = events.append
+    client.start()
+    client.thread.join(10)
+    return events
+
+
+def test_sync_ignores_a_partial_state_file(tmp_path, server):
+    state_path = tmp_path / "sync.json"
+    # An older run that wrote the manifest validators but no file list
+    state_path.write_text(json.dumps({"version": STATE_VERSION, "manifest": {"last_modified": "Thu, 01 Jan 2099 00:00:00 GMT"}}), encoding="utf-8")
+    events = run(SyncClient(server, str(tmp_path / "mirror"), str(state_path)))
+    assert events[-1]["done"] and events[-1]["fetched"] == 1
+    assert os.path.exists(tmp_path / "mirror" / "BLUS00001.savepatch")
+
+
+def test_sync_reports_unexpected_errors(tmp_path, server):
+    client = SyncClient(server, str(tmp_path / "mirror"), str(tmp_path / "sync.json"))
+
+    def broken():
+        raise KeyError("files")
+
+    client.sync = broken
+    events = run(client)
+    assert events[-1]["done"] and "error" in events[-1]
+
+
+def test_failed_download_leaves_no_part_file(tmp_path, server):
+    client = SyncClient(server, str(tmp_path / "mirror"), str(tmp_path / "sync.json"))
+
+    class CutShort:
+        status = 200
+
+        def __init__(self):
+            self.chunks = [b"[Max Money]\n"]
+
+        def read(self, size=-1):
+            if not self.chunks:
+                raise OSError("connection reset")
+            return self.chunks.pop()
+
+    client._get = lambda name, headers: CutShort()
+    with pytest.raises(OSError):
+        client._fetch("BLUS00001.savepatch", None)
+    assert os.listdir(tmp_path / "mirror") == []
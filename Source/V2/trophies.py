@@ -0,0 +1,260 @@
+# Reads PS3 trophy sets, one folder per game as under
+# dev_hdd0/home/<user>/trophy/<NPWR id>:
+#
+#     TROPCONF.SFM  XML: game name and every trophy's name, grade and text
+#     TROPUSR.DAT   binary tables: grades (type 4) and unlock states (type 6)
+#     TROPTRNS.DAT  unlock history, not needed for any of this
+#
+# The overview only reads the head of TROPCONF.SFM (up to the first trophy)
+# and the two TROPUSR.DAT tables. Those summaries are cached on disk by file
+# mtime, so reopening a profile stats the folders and parses nothing. The
+# full XML is only parsed when a game is opened.
+#
+# All the work runs on one worker thread, results come back through poll()
+# and poll_details().
+import json
+import os
+import re
+import struct
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+
+CONF_NAME = "TROPCONF.SFM"
+USR_NAME = "TROPUSR.DAT"
+
+USR_MAGIC = 0x818F54AD
+USR_HEADER = struct.Struct(">IIII32x")  # magic, version, table count, unknown
+USR_TABLE = struct.Struct(">IIIIQ8x")  # type, entry size, unknown, entries, offset
+USR_ENTRY = struct.Struct(">IIII")  # type, size, id, unknown; the entry follows
+USR_GRADE = struct.Struct(">II")  # trophy id, grade
+USR_STATE = struct.Struct(">II8xQ")  # trophy id, unlocked, unlock time
+TABLE_GRADES = 4
+TABLE_STATES = 6
+
+GRADES = {1: "P", 2: "G", 3: "S", 4: "B"}
+GRADE_ORDER = "PGSB"
+# Unlock times count microseconds from 0001-01-01
+PS3_EPOCH_OFFSET = 62135596800
+
+CONF_HEAD_CHUNK = 4096
+CONF_HEAD_LIMIT = 64 * 1024
+CONF_TROPHY_RE = re.compile(rb"<trophy[\s>]")
+CONF_TITLE_RE = re.compile(rb"<title-name>(.*?)</title-name>", re.DOTALL)
+CONF_NPCOMMID_RE = re.compile(rb"<npcommid>(.*?)</npcommid>", re.DOTALL)
+
+CACHE_VERSION = 1
+
+# grades: earned trophies per grade letter
+TrophySet = namedtuple("TrophySet", "path npcommid title total earned grades mtime")
+Trophy = namedtuple("Trophy", "id name detail grade hidden earned time")
+
+
+# Folders holding a TROPCONF.SFM, down to home/<user>/trophy/<set>
+def trophy_folders(root, depth=4):
+    try:
+        with os.scandir(root) as entries:
+            dirs = sorted(entry.path for entry in entries if entry.is_dir())
+    except OSError:
+        return
+    for path in dirs:
+        if os.path.isfile(os.path.join(path, CONF_NAME)):
+            yield path
+        elif depth > 1:
+            yield from trophy_folders(path, depth - 1)
+
+# Start of TROPCONF.SFM, up to the first <trophy> element
+def read_conf_head(path):
+    head = b""
+    with open(path, "rb") as f:
+        while len(head) < CONF_HEAD_LIMIT:
+            chunk = f.read(CONF_HEAD_CHUNK)
+            if not chunk:
+                break
+            head += chunk
+            if CONF_TROPHY_RE.search(head):
+                break
+    return head
+
+def conf_text(pattern, data):
+    match = pattern.search(data)
+    return " ".join(unescape(match.group(1).decode("utf-8", "replace")).split()) if match else ""
+
+# trophy id -> [grade letter, unlocked, unlock time (unix seconds, 0 if locked)]
+def read_usr(path):
+    trophies = {}
+    with open(path, "rb") as f:
+        magic, _, table_count, _ = USR_HEADER.unpack(f.read(USR_HEADER.size))
+        if magic != USR_MAGIC:
+            raise ValueError("not a TROPUSR.DAT file")
+        tables = [USR_TABLE.unpack(f.read(USR_TABLE.size)) for _ in range(table_count)]
+        for kind, entry_size, _, count, offset in tables:
+            if kind not in [TABLE_GRADES, TABLE_STATES]:
+                continue
+            stride = USR_ENTRY.size + entry_size
+            f.seek(offset)
+            data = f.read(stride * count)
+            for pos in range(USR_ENTRY.size, stride * count, stride):
+                if kind == TABLE_GRADES:
+                    trophy_id, grade = USR_GRADE.unpack_from(data, pos)
+                    trophies.setdefault(trophy_id, ["B", False, 0])[0] = GRADES.get(grade, "B")
+                else:
+                    trophy_id, unlocked, ticks = USR_STATE.unpack_from(data, pos)
+                    trophy = trophies.setdefault(trophy_id, ["B", False, 0])
+                    trophy[1] = bool(unlocked)
+                    trophy[2] = max(0, ticks // 1000000 - PS3_EPOCH_OFFSET) if unlocked and ticks else 0
+    return trophies
+
+def file_mtimes(path):
+    mtimes = []
+    for name in [CONF_NAME, USR_NAME]:
+        try:
+            mtimes.append(os.stat(os.path.join(path, name)).st_mtime_ns)
+        except OSError:
+            mtimes.append(0)
+    return mtimes
+
+def read_summary(path, mtime):
+    conf_path = os.path.join(path, CONF_NAME)
+    head = read_conf_head(conf_path)
+    usr_path = os.path.join(path, USR_NAME)
+    if os.path.isfile(usr_path):
+        trophies = read_usr(usr_path)
+        total = len(trophies)
+    else:
+        # Never played: nothing is earned, the total has to come from the XML
+        trophies = {}
+        with open(conf_path, "rb") as f:
+            total = len(CONF_TROPHY_RE.findall(f.read()))
+    grades = dict.fromkeys(GRADE_ORDER, 0)
+    for grade, unlocked, _ in trophies.values():
+        if unlocked:
+            grades[grade] += 1
+    title = conf_text(CONF_TITLE_RE, head) or os.path.basename(path)
+    return TrophySet(path, conf_text(CONF_NPCOMMID_RE, head), title, total, sum(grades.values()), grades, mtime)
+
+# Every trophy of a set, with its unlock state, in TROPCONF.SFM order
+def read_trophies(path):
+    with open(os.path.join(path, CONF_NAME), "rb") as f:
+        data = f.read()
+    # Signed files carry a binary header in front of the XML
+    start, end = data.find(b"<trophyconf"), data.rfind(b"</trophyconf>")
+    if start < 0 or end < start:
+        raise ValueError("not a TROPCONF.SFM file")
+    root = ET.fromstring(data[start:end + len(b"</trophyconf>")])
+    usr_path = os.path.join(path, USR_NAME)
+    states = read_usr(usr_path) if os.path.isfile(usr_path) else {}
+    trophies = []
+    for node in root.iter("trophy"):
+        trophy_id = int(node.get("id", "0"), 10)
+        grade, unlocked, time = states.get(trophy_id, ["B", False, 0])
+        trophies.append(Trophy(
+            trophy_id,
+            " ".join((node.findtext("name") or "").split()),
+            " ".join((node.findtext("detail") or "").split()),
+            node.get("ttype", grade).upper(),
+            node.get("hidden") == "yes",
+            unlocked,
+            time,
+        ))
+    return trophies
+
+
+class TrophyLibrary:
+    def __init__(self, cache_path, notify=None):
+        self.cache_path = cache_path
+        self.notify = notify
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trophies")
+        self.cache = None  # path -> TrophySet fields, only touched on the worker
+        self.loading = None
+        self.opening = None
+        self.counts = {}  # sets found by the last refresh, from the cache, parsed, unreadable
+
+    def _submit(self, fn, *args):
+        future = self.pool.submit(fn, *args)
+        if self.notify is not None:
+            future.add_done_callback(lambda _: self.notify())
+        return future
+
+    # Summaries of every set under `roots`, in the background
+    def refresh(self, roots):
+        if self.loading is None or self.loading.done():
+            self.loading = self._submit(self._refresh, roots)
+
+    def _refresh(self, roots):
+        if self.cache is None:
+            self.cache = self.load_cache()
+        counts = {"sets": 0, "cached": 0, "parsed": 0, "errors": 0}
+        found = {}
+        for root in roots:
+            for path in trophy_folders(os.path.abspath(root)):
+                counts["sets"] += 1
+                mtime = file_mtimes(path)
+                record = self.cache.get(path)
+                if record is not None and record["mtime"] == mtime:
+                    found[path] = record
+                    counts["cached"] += 1
+                    continue
+                try:
+                    found[path] = read_summary(path, mtime)._asdict()
+                except (OSError, ValueError, struct.error):
+                    counts["errors"] += 1
+                    continue
+                counts["parsed"] += 1
+        if found != self.cache:
+            self.cache = found
+            self.save_cache()
+        self.counts = counts
+        return sorted((TrophySet(**record) for record in found.values()), key=lambda info: (info.title.lower(), info.path))
+
+    # Trophies of one set, parsed in full on the worker. An earlier request
+    # still queued is dropped
+    def open(self, path):
+        if self.opening is not None:
+            self.opening.cancel()
+        self.opening = self._submit(read_trophies, path)
+
+    def ready(self):
+        return (self.loading is None or self.loading.done()) and (self.opening is None or self.opening.done())
+
+    # Set summaries once the refresh has finished, otherwise None
+    def poll(self):
+        if self.loading is None or not self.loading.done() or self.loading.cancelled():
+            return None
+        future, self.loading = self.loading, None
+        return future.result()
+
+    # Trophies of the set last opened once parsed, otherwise None
+    def poll_details(self):
+        if self.opening is None or not self.opening.done():
+            return None
+        future, self.opening = self.opening, None
+        try:
+            return future.result()
+        except (OSError, ValueError, SyntaxError, struct.error) as e:
+            print(f"Could not read trophies: {e}")
+            return []
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("sets", {})
+
+    def save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "sets": self.cache}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write the trophy cache: {e}")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,80 @@
+# Declarative tweens for fades and other timed transitions. A Timeline holds
+# named tweens, advances them once per frame and drops them when they finish,
+# so finished transitions cost nothing.
+
+def linear(t):
+    return t
+
+def ease_in(t):
+    return t * t
+
+def ease_out(t):
+    return 1 - (1 - t) * (1 - t)
+
+def ease_in_out(t):
+    return 3 * t * t - 2 * t * t * t
+
+
+class Tween:
+    def __init__(self, duration, start=0.0, end=1.0, easing=linear, delay=0, on_complete=None):
+        self.duration = duration
+        self.start = start
+        self.end = end
+        self.easing = easing
+        self.delay = delay
+        self.on_complete = on_complete
+        self.started = None
+        self.value = start
+        self.done = False
+
+    # Advances to time `now` (ms), returns True once finished
+    def update(self, now):
+        if self.started is None:
+            self.started = now
+        elapsed = now - self.started - self.delay
+        if elapsed <= 0:
+            self.value = self.start
+            return False
+        t = 1.0 if self.duration <= 0 else min(1.0, elapsed / self.duration)
+        self.value = self.start + (self.end - self.start) * self.easing(t)
+        self.done = t >= 1.0
+        return self.done
+
+
+class Timeline:
+    def __init__(self):
+        self.tweens = {}
+        self.now = None
+
+    # Starts a tween under `name`, replacing any running one with that name.
+    # Without `now` it starts at the time of the last update()
+    def add(self, name, tween, now=None):
+        tween.started = self.now if now is None else now
+        self.tweens[name] = tween
+        return tween
+
+    def cancel(self, name):
+        self.tweens.pop(name, None)
+
+    def clear(self):
+        self.tweens.clear()
+
+    def update(self, now):
+        self.now = now
+        finished = [(name, tween) for name, tween in list(self.tweens.items()) if tween.update(now)]
+        for name, tween in finished:
+            # on_complete may already have started a new tween with the same name
+            if self.tweens.get(name) is tween:
+                del self.tweens[name]
+            if tween.on_complete is not None:
+                tween.on_complete()
+
+    def value(self, name, default=None):
+        tween = self.tweens.get(name)
+        return default if tween is None else tween.value
+
+    def active(self):
+        return bool(self.tweens)
+
+    def __contains__(self, name):
+        return name in self.tweens
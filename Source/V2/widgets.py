@@ -0,0 +1,55 @@
+import pygame
+
+
+# Scrolling list that only draws the rows in view, so its cost depends on the
+# window height and not on how many items it holds. draw_row(surface, index,
+# rect) paints one row; rows are never built ahead of time.
+class ListView:
+    def __init__(self, rect, row_height, draw_row):
+        self.rect = pygame.Rect(rect)
+        self.row_height = row_height
+        self.draw_row = draw_row
+        self.count = 0
+        self.scroll = 0  # pixels
+
+    def max_scroll(self):
+        return max(0, self.count * self.row_height - self.rect.height)
+
+    def set_count(self, count):
+        self.count = count
+        self.scroll = min(self.scroll, self.max_scroll())
+
+    def set_rect(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.scroll = min(self.scroll, self.max_scroll())
+
+    # Returns True when the view moved
+    def scroll_by(self, pixels):
+        scroll = min(max(self.scroll + pixels, 0), self.max_scroll())
+        moved = scroll != self.scroll
+        self.scroll = scroll
+        return moved
+
+    def page_height(self):
+        return max(self.row_height, self.rect.height - self.row_height)
+
+    # Indices of the rows at least partly in view
+    def visible(self):
+        first = self.scroll // self.row_height
+        last = min(self.count, -(-(self.scroll + self.rect.height) // self.row_height))
+        return range(first, last)
+
+    def row_rect(self, index):
+        return pygame.Rect(self.rect.x, self.rect.y + index * self.row_height - self.scroll, self.rect.width, self.row_height)
+
+    def row_at(self, pos):
+        if not self.rect.collidepoint(pos):
+            return None
+        index = (pos[1] - self.rect.y + self.scroll) // self.row_height
+        return index if index < self.count else None
+
+    def draw(self, surface):
+        surface.set_clip(self.rect)
+        for index in self.visible():
+            self.draw_row(surface, index, self.row_rect(index))
+        surface.set_clip(None)